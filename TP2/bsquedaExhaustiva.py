@@ -1,7 +1,15 @@
 from dataclasses import dataclass
-from typing import Callable, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Generator, List, Optional, Tuple
 import argparse
+import asyncio
+import csv
 import json
+import random
+import sys
+import time
+
+import numpy as np
 
 
 @dataclass
@@ -13,49 +21,592 @@ class ScanResult:
     visited: List[float]
 
 
+# Una estrategia de palpado es un generador: produce la próxima posición a
+# palpar, recibe con send() si el palpado fue exitoso y, al terminar, devuelve
+# la posición localizada (o None). Así las posiciones se generan de a una y el
+# que consume decide cómo palpar (sincrónico, asíncrono, simulado, en lote).
+ProbeStrategy = Generator[float, bool, Optional[float]]
+
+
+@dataclass
+class Prior:
+    """
+    Conocimiento previo sobre la posición del objetivo.
+    kind: "uniform" (mean ± spread) o "gaussian" (media mean, desvío spread).
+    """
+    kind: str = "uniform"
+    mean: float = 0.0
+    spread: float = 2.0
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        if self.kind == "uniform":
+            return rng.uniform(self.mean - self.spread, self.mean + self.spread, n)
+        if self.kind == "gaussian":
+            return rng.normal(self.mean, self.spread, n)
+        raise ValueError(f"Prior desconocido: {self.kind} (opciones: uniform, gaussian)")
+
+
+def symmetric_probes(
+    start: float, step: float = 0.1, max_range: float = 2.0,
+    tol: float = 0.0, prior: Optional[Prior] = None,
+) -> ProbeStrategy:
+    """
+    Patrón original: start, +Δ, -Δ, +2Δ, -2Δ, ... hasta que k*Δ supere
+    `max_range`. No usa el prior. El cabezal recorre ~k²Δ.
+    """
+    if (yield start):
+        return start
+    k = 1
+    while k * step <= max_range:
+        for direction in (+1, -1):
+            x = start + direction * k * step
+            if (yield x):
+                return x
+        k += 1
+    return None
+
+
+def _toward(start: float, prior: Optional[Prior]) -> int:
+    # Lado (+1 / -1) donde el prior pone el objetivo; a la derecha si no hay preferencia
+    return -1 if prior is not None and prior.mean < start else +1
+
+
+def doubling_probes(
+    start: float, step: float = 0.1, max_range: float = 2.0,
+    tol: float = 0.0, prior: Optional[Prior] = None,
+) -> ProbeStrategy:
+    """
+    Búsqueda del "camino de la vaca": barre un lado hasta un radio r, vuelve y
+    barre el otro hasta 2r, luego 4r, ... palpando cada Δ sólo en celdas
+    nuevas. Empieza hacia el lado del prior con r = distancia a su media (al
+    menos Δ). El recorrido total es O(distancia al objetivo) en lugar de O(k²Δ).
+    """
+    kmax = int(max_range // step) + 1
+    while kmax * step > max_range:
+        kmax -= 1
+    if (yield start):
+        return start
+    side = _toward(start, prior)
+    radius = max(1, round(abs(prior.mean - start) / step)) if prior is not None else 1
+    covered = {+1: 0, -1: 0}
+    while covered[+1] < kmax or covered[-1] < kmax:
+        for k in range(covered[side] + 1, min(radius, kmax) + 1):
+            x = start + side * k * step
+            if (yield x):
+                return x
+        covered[side] = max(covered[side], min(radius, kmax))
+        side = -side
+        radius *= 2
+    return None
+
+
+def one_sided_probes(
+    start: float, step: float = 0.1, max_range: float = 2.0,
+    tol: float = 0.0, prior: Optional[Prior] = None,
+) -> ProbeStrategy:
+    """
+    Barrido de un solo lado: recorre entero el lado donde el prior ubica el
+    objetivo y recién después el otro. Conviene cuando el prior está muy
+    sesgado; el peor recorrido es 3 * max_range.
+    """
+    if (yield start):
+        return start
+    first = _toward(start, prior)
+    for side in (first, -first):
+        k = 1
+        while k * step <= max_range:
+            x = start + side * k * step
+            if (yield x):
+                return x
+            k += 1
+    return None
+
+
+def coarse_to_fine_probes(
+    start: float, step: float = 0.1, max_range: float = 2.0,
+    tol: float = 0.0, prior: Optional[Prior] = None,
+) -> ProbeStrategy:
+    """
+    Pasada gruesa con el mayor paso que no puede saltear el objetivo,
+    c = 2·tol, en patrón simétrico alrededor de la media del prior (recortada
+    al rango). Como cada palpado cubre [x - tol, x + tol], la grilla no deja
+    huecos esté donde esté anclada. Con tol = 0 sólo se puede acertar sobre
+    la grilla de paso Δ, que se usa entonces como paso grueso. Tras el primer
+    contacto en x, el objetivo está en [x - tol, x + tol]: se ajusta el borde
+    izquierdo del contacto por bisección hasta la resolución Δ/2 y se
+    devuelve el centro estimado.
+    """
+    lo, hi = start - max_range, start + max_range
+    center = min(max(prior.mean, lo), hi) if prior is not None else start
+    coarse = 2 * tol if tol > 0 else step
+    hit_at = None
+    if (yield center):
+        hit_at = center
+    # Cada lado termina palpando su extremo del rango (el último paso se recorta)
+    open_sides = {+1: center < hi, -1: center > lo}
+    k = 1
+    while hit_at is None and (open_sides[+1] or open_sides[-1]):
+        for direction in (+1, -1):
+            if not open_sides[direction]:
+                continue
+            x = center + direction * k * coarse
+            if not lo < x < hi:
+                x = hi if direction > 0 else lo
+                open_sides[direction] = False
+            if (yield x):
+                hit_at = x
+                break
+        k += 1
+    if hit_at is None:
+        return None
+    if tol <= 0:
+        return hit_at
+    # Bisección del borde izquierdo del contacto: sin contacto en `a`, contacto en `b`
+    a, b = hit_at - 2 * tol, hit_at
+    while b - a > step / 2:
+        mid = (a + b) / 2
+        if (yield mid):
+            b = mid
+        else:
+            a = mid
+    return (a + b) / 2 + tol
+
+
+STRATEGIES: Dict[str, Callable[..., ProbeStrategy]] = {
+    "symmetric": symmetric_probes,
+    "doubling": doubling_probes,
+    "one_sided": one_sided_probes,
+    "coarse_to_fine": coarse_to_fine_probes,
+}
+
+
+def drive_scan(
+    strategy: ProbeStrategy, sense: Callable[[float], bool], start: float, keep_visited: bool = False,
+) -> ScanResult:
+    """
+    Ejecuta una estrategia contra un sensor sincrónico. `visited` sólo se
+    guarda con keep_visited=True (si no, memoria constante).
+    """
+    visited: List[float] = []
+    probes = 0
+    path = 0.0
+    last_x = start
+    try:
+        x = next(strategy)
+        while True:
+            path += abs(x - last_x)
+            last_x = x
+            probes += 1
+            if keep_visited:
+                visited.append(round(x, 6))
+            x = strategy.send(sense(x))
+    except StopIteration as stop:
+        position = stop.value
+    return ScanResult(position is not None, position, probes, path, visited)
+
+
 def exhaustive_line_search(
     start: float,
     sense: Callable[[float], bool],
     step: float = 0.1,
     max_range: float = 2.0,
+    keep_visited: bool = True,
 ) -> ScanResult:
     """
     Búsqueda exhaustiva a lo largo de una línea 1D centrada en `start`.
     Patrón: start, +Δ, -Δ, +2Δ, -2Δ, ... hasta que k*Δ supere `max_range`.
     """
+    return drive_scan(symmetric_probes(start, step, max_range), sense, start, keep_visited)
+
+
+def make_sensor(target: float, tol: float) -> Callable[[float], bool]:
+    """
+    Sensor idealizado: devuelve True si |x - target| <= tol (palpado exitoso).
+    """
+    return lambda x: abs(x - target) <= tol
+
+
+@dataclass
+class BatchScanResult:
+    # Resultados en columnas (un elemento por caso), en lugar de una lista de ScanResult
+    found: np.ndarray        # bool
+    position: np.ndarray     # float, NaN si no se encontró
+    probes: np.ndarray       # int64
+    path_length: np.ndarray  # float
+
+    def __len__(self) -> int:
+        return len(self.found)
+
+    def row(self, i: int) -> ScanResult:
+        # Caso i como ScanResult (sin la lista de visitados)
+        pos = None if not self.found[i] else float(self.position[i])
+        return ScanResult(bool(self.found[i]), pos, int(self.probes[i]), float(self.path_length[i]), [])
+
+
+def ring_counts(steps: np.ndarray, max_range: float) -> np.ndarray:
+    """
+    Cantidad de anillos k >= 1 que recorre `exhaustive_line_search` para cada
+    paso: el mayor k con k*Δ <= max_range, evaluado igual que el bucle escalar
+    (se corrige el redondeo de floor(max_range / Δ) en ±1).
+    """
+    k = np.floor(max_range / steps).astype(np.int64)
+    k = np.maximum(k, 0)
+    k += ((k + 1) * steps <= max_range)
+    k -= (k > 0) & (k * steps > max_range)
+    return k
+
+
+def _broadcast_cases(starts, targets, tolerances, steps):
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (starts, targets, tolerances, steps)))
+    return [np.ascontiguousarray(a.ravel()) for a in arrays]
+
+
+def batch_line_search_scan(
+    starts, targets, tolerances, steps, max_range: float = 2.0, max_memory_mb: float = 64.0,
+) -> BatchScanResult:
+    """
+    Simula `exhaustive_line_search` + `make_sensor` para todos los casos a la
+    vez. Arma la secuencia start, +Δ, -Δ, +2Δ, ... como matriz (casos x
+    palpados), marca los palpados exitosos y toma el primero de cada fila. El
+    recorrido se acumula con cumsum sobre las mismas diferencias que el bucle
+    escalar, así que los resultados coinciden bit a bit. Los casos se procesan
+    en bloques de filas para no superar `max_memory_mb`.
+    """
+    starts, targets, tolerances, steps = _broadcast_cases(starts, targets, tolerances, steps)
+    n = len(starts)
+    rings = ring_counts(steps, max_range)
+    found = np.zeros(n, dtype=bool)
+    position = np.full(n, np.nan)
+    probes = np.zeros(n, dtype=np.int64)
+    path_length = np.zeros(n)
+    if n == 0:
+        return BatchScanResult(found, position, probes, path_length)
+
+    width = 2 * int(rings.max()) + 1
+    # Multiplicadores de la secuencia: 0, +1, -1, +2, -2, ...
+    cols = np.arange(width)
+    mult = np.where(cols % 2 == 1, (cols + 1) // 2, -(cols // 2)).astype(np.float64)
+    # Varias matrices float64/bool de ancho `width` por fila
+    rows_per_block = max(1, int(max_memory_mb * 2**20 // (width * 8 * 5)))
+
+    for lo in range(0, n, rows_per_block):
+        hi = min(lo + rows_per_block, n)
+        s, t, tol, d = starts[lo:hi, None], targets[lo:hi, None], tolerances[lo:hi, None], steps[lo:hi, None]
+        x = s + mult * d
+        valid = cols <= 2 * rings[lo:hi, None]
+        hit = (np.abs(x - t) <= tol) & valid
+        any_hit = hit.any(axis=1)
+        last = 2 * rings[lo:hi]
+        first = np.where(any_hit, hit.argmax(axis=1), last)
+        moves = np.abs(np.diff(x, axis=1))
+        moves[~valid[:, 1:]] = 0.0
+        cum = np.concatenate([np.zeros((hi - lo, 1)), np.cumsum(moves, axis=1)], axis=1)
+        rows = np.arange(hi - lo)
+        found[lo:hi] = any_hit
+        position[lo:hi] = np.where(any_hit, x[rows, first], np.nan)
+        probes[lo:hi] = first + 1
+        path_length[lo:hi] = cum[rows, first]
+    return BatchScanResult(found, position, probes, path_length)
+
+
+def batch_line_search_closed_form(
+    starts, targets, tolerances, steps, max_range: float = 2.0,
+) -> BatchScanResult:
+    """
+    Camino rápido para el sensor idealizado de `make_sensor`: el palpado es
+    exitoso en el intervalo [target - tol, target + tol], así que el primer
+    k de cada lado sale de un ceil (verificado con los vecinos k-1, k, k+1 para
+    absorber el redondeo). El palpado m-ésimo (m >= 1) se alcanza tras mover
+    mΔ, y el recorrido total es Δ·m(m+1)/2 (igual al escalar salvo redondeo).
+    O(casos) en tiempo y memoria, sin depender del rango.
+    """
+    starts, targets, tolerances, steps = _broadcast_cases(starts, targets, tolerances, steps)
+    rings = ring_counts(steps, max_range)
+    lo_edge, hi_edge = targets - tolerances, targets + tolerances
+    big = np.iinfo(np.int64).max
+
+    def first_index(direction: int) -> np.ndarray:
+        # Índice m del primer palpado exitoso en la dirección dada (big si no hay)
+        edge = lo_edge if direction > 0 else hi_edge
+        with np.errstate(invalid="ignore", divide="ignore"):
+            k0 = np.ceil(direction * (edge - starts) / steps)
+        k0 = np.clip(np.nan_to_num(k0, nan=1.0, posinf=big, neginf=1.0), 1, rings + 1).astype(np.int64)
+        best = np.full(len(starts), big, dtype=np.int64)
+        for k in (k0 + 1, k0, k0 - 1):  # de mayor a menor: queda el menor válido
+            x = starts + (direction * k) * steps
+            ok = (k >= 1) & (k <= rings) & (np.abs(x - targets) <= tolerances)
+            best = np.where(ok, k, best)
+        return np.where(best == big, big, 2 * best - (1 if direction > 0 else 0))
+
+    at_start = np.abs(starts - targets) <= tolerances
+    m = np.minimum(first_index(+1), first_index(-1))
+    m = np.where(at_start, 0, m)
+    found = m != big
+    m = np.where(found, m, 2 * rings)
+    k = (m + 1) // 2
+    sign = np.where(m % 2 == 1, 1.0, -1.0)
+    position = np.where(found, starts + (sign * k) * steps, np.nan)
+    path_length = steps * (m * (m + 1) / 2)
+    return BatchScanResult(found, position, m + 1, path_length)
+
+
+BATCH_METHODS = {
+    "scan": batch_line_search_scan,
+    "closed_form": batch_line_search_closed_form,
+}
+
+
+def batch_line_search(
+    starts, targets, tolerances, steps, max_range: float = 2.0, method: str = "closed_form",
+) -> BatchScanResult:
+    """
+    Versión en lote de `exhaustive_line_search` con el sensor de `make_sensor`.
+    Acepta arrays (o escalares, con broadcasting) de inicios, objetivos,
+    tolerancias y pasos y devuelve un BatchScanResult en columnas.
+    method: "closed_form" (O(casos)) o "scan" (matriz de palpados, bit a bit
+    igual al bucle escalar).
+    """
+    try:
+        fn = BATCH_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Método desconocido: {method} (opciones: {', '.join(BATCH_METHODS)})")
+    return fn(starts, targets, tolerances, steps, max_range)
+
+
+def read_batch_csv(path: str) -> Dict[str, np.ndarray]:
+    # CSV con columnas start, target, tolerance, step ("-" = stdin)
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        rows = list(csv.DictReader(f))
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return {key: np.array([float(r[key]) for r in rows]) for key in ("start", "target", "tolerance", "step")}
+
+
+def write_batch_csv(cases: Dict[str, np.ndarray], result: BatchScanResult, out=sys.stdout) -> None:
+    writer = csv.writer(out)
+    writer.writerow(["start", "target", "tolerance", "step", "found", "position", "probes", "path_length"])
+    for i in range(len(result)):
+        pos = "" if not result.found[i] else repr(float(result.position[i]))
+        writer.writerow([cases["start"][i], cases["target"][i], cases["tolerance"][i], cases["step"][i],
+                         int(result.found[i]), pos, int(result.probes[i]), repr(float(result.path_length[i]))])
+
+
+def benchmark_batch(n: int, max_range: float = 2.0, seed: int = 0) -> Dict[str, float]:
+    """
+    Compara el bucle escalar (exhaustive_line_search + make_sensor) con los dos
+    modos en lote sobre `n` casos aleatorios y verifica que coincidan.
+    """
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform(-1.0, 1.0, n)
+    targets = rng.uniform(-2.0, 2.0, n)
+    tolerances = rng.uniform(0.01, 0.08, n)
+    steps = rng.choice([0.02, 0.05, 0.1], n)
+
+    t0 = time.perf_counter()
+    loop = [exhaustive_line_search(s, make_sensor(t, tol), d, max_range)
+            for s, t, tol, d in zip(starts.tolist(), targets.tolist(), tolerances.tolist(), steps.tolist())]
+    loop_ms = (time.perf_counter() - t0) * 1000
+    timings = {"cases": n, "loop_ms": loop_ms}
+    for name, fn in BATCH_METHODS.items():
+        t0 = time.perf_counter()
+        res = fn(starts, targets, tolerances, steps, max_range)
+        timings[f"{name}_ms"] = (time.perf_counter() - t0) * 1000
+        if (res.found.tolist() != [r.found for r in loop]
+                or res.probes.tolist() != [r.probes for r in loop]
+                or not np.allclose(res.path_length, [r.path_length for r in loop], rtol=1e-9, atol=1e-9)):
+            raise RuntimeError(f"El modo en lote '{name}' no coincide con el bucle escalar")
+    return timings
+
+
+# ---------------------------------------------------------------------------
+# Palpado asíncrono: varios cabezales concurrentes contra sensores con latencia
+# ---------------------------------------------------------------------------
+
+class SimulatedSensor:
+    """
+    Sensor asíncrono simulado (mismo criterio que `make_sensor`) con latencia
+    configurable por palpado: latency_s ± jitter_s (uniforme). Interfaz de un
+    sensor asíncrono: `await sensor.sense(x) -> bool`.
+    """
+    def __init__(self, target: float, tol: float, latency_s: float = 0.005,
+                 jitter_s: float = 0.0, seed: Optional[int] = None):
+        self.target = target
+        self.tol = tol
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    async def sense(self, x: float) -> bool:
+        delay = self.latency_s
+        if self.jitter_s:
+            delay += self.rng.uniform(-self.jitter_s, self.jitter_s)
+        await asyncio.sleep(max(0.0, delay))
+        self.calls += 1
+        return abs(x - self.target) <= self.tol
+
+
+async def async_line_search(
+    start: float, sensor, step: float = 0.1, max_range: float = 2.0,
+    strategy: str = "symmetric", tol: float = 0.0, prior: Optional[Prior] = None,
+    keep_visited: bool = False, on_probe: Optional[Callable[[float, bool], None]] = None,
+) -> ScanResult:
+    """
+    Versión asíncrona de `drive_scan`: cada palpado espera `sensor.sense(x)`
+    sin bloquear el loop, así otros cabezales avanzan mientras tanto.
+    `on_probe(x, contacto)` recibe cada resultado apenas llega.
+    """
+    gen = STRATEGIES[strategy](start, step, max_range, tol, prior)
     visited: List[float] = []
     probes = 0
     path = 0.0
     last_x = start
+    try:
+        x = next(gen)
+        while True:
+            path += abs(x - last_x)
+            last_x = x
+            probes += 1
+            if keep_visited:
+                visited.append(round(x, 6))
+            hit = await sensor.sense(x)
+            if on_probe is not None:
+                on_probe(x, hit)
+            x = gen.send(hit)
+    except StopIteration as stop:
+        position = stop.value
+    return ScanResult(position is not None, position, probes, path, visited)
 
-    def palp(x: float) -> bool:
-        nonlocal probes
-        probes += 1
-        visited.append(round(x, 6))
-        return sense(x)
 
-    # Palpado en la posición inicial
-    if palp(start):
-        return ScanResult(True, start, probes, path, visited)
+async def iter_scan_heads(
+    heads: List[Tuple[float, object]], step: float = 0.1, max_range: float = 2.0,
+    strategy: str = "symmetric", tol: float = 0.0, prior: Optional[Prior] = None,
+    max_concurrency: Optional[int] = None,
+) -> AsyncIterator[Tuple[int, ScanResult]]:
+    """
+    Corre un cabezal por cada (start, sensor) de forma concurrente y entrega
+    (índice, ScanResult) en orden de finalización. `max_concurrency` limita
+    cuántos cabezales palpan a la vez.
+    """
+    limit = asyncio.Semaphore(max_concurrency or len(heads) or 1)
 
-    k = 1
-    while k * step <= max_range:
-        for direction in (+1, -1):
-            x = start + direction * k * step
-            path += abs(x - last_x)
-            last_x = x
-            if palp(x):
-                return ScanResult(True, x, probes, path, visited)
-        k += 1
+    async def run(i: int, start: float, sensor) -> Tuple[int, ScanResult]:
+        async with limit:
+            return i, await async_line_search(start, sensor, step, max_range, strategy, tol, prior)
 
-    return ScanResult(False, None, probes, path, visited)
+    tasks = [asyncio.ensure_future(run(i, start, sensor)) for i, (start, sensor) in enumerate(heads)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
-def make_sensor(target: float, tol: float) -> Callable[[float], bool]:
+async def _throughput(n_heads: int, latency_s: float, jitter_s: float, step: float, max_range: float,
+                      tol: float, strategy: str, seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    sensors = [SimulatedSensor(rng.uniform(-max_range, max_range), tol, latency_s, jitter_s, seed + i)
+               for i in range(n_heads)]
+    t0 = time.perf_counter()
+    found = 0
+    async for _, res in iter_scan_heads([(0.0, s) for s in sensors], step, max_range, strategy, tol):
+        found += res.found
+    wall = time.perf_counter() - t0
+    probes = sum(s.calls for s in sensors)
+    return {"heads": n_heads, "found": found, "probes": probes, "wall_s": wall,
+            "probes_per_s": probes / wall if wall else 0.0,
+            "sequential_s": probes * latency_s}
+
+
+def measure_async_throughput(n_heads: int, latency_s: float = 0.005, jitter_s: float = 0.0,
+                             step: float = 0.1, max_range: float = 2.0, tol: float = 0.05,
+                             strategy: str = "symmetric", seed: int = 0) -> Dict[str, float]:
     """
-    Sensor idealizado: devuelve True si |x - target| <= tol (palpado exitoso).
+    Corre `n_heads` cabezales concurrentes con sensores simulados y objetivos
+    aleatorios; compara el tiempo real con el que tomaría palpar en serie.
     """
-    return lambda x: abs(x - target) <= tol
+    return asyncio.run(_throughput(n_heads, latency_s, jitter_s, step, max_range, tol, strategy, seed))
+
+
+# ---------------------------------------------------------------------------
+# Evaluación Monte Carlo de estrategias
+# ---------------------------------------------------------------------------
+
+def _evaluate_chunk(strategy: str, targets: np.ndarray, start: float, step: float, max_range: float,
+                    tol: float, prior: Prior) -> Dict[str, np.ndarray]:
+    fn = STRATEGIES[strategy]
+    n = len(targets)
+    out = {"probes": np.zeros(n, dtype=np.int64), "path": np.zeros(n), "found": np.zeros(n, dtype=bool),
+           "error": np.full(n, np.nan)}
+    for i, t in enumerate(targets.tolist()):
+        res = drive_scan(fn(start, step, max_range, tol, prior), make_sensor(t, tol), start)
+        out["probes"][i] = res.probes
+        out["path"][i] = res.path_length
+        out["found"][i] = res.found
+        if res.found:
+            out["error"][i] = abs(res.position - t)
+    return out
+
+
+def _summary(parts: List[Dict[str, np.ndarray]]) -> Dict[str, float]:
+    probes = np.concatenate([p["probes"] for p in parts])
+    path = np.concatenate([p["path"] for p in parts])
+    found = np.concatenate([p["found"] for p in parts])
+    error = np.concatenate([p["error"] for p in parts])
+    return {
+        "trials": int(len(probes)),
+        "success_rate": float(found.mean()) if len(found) else 0.0,
+        "probes_mean": float(probes.mean()),
+        "probes_p95": float(np.percentile(probes, 95)),
+        "probes_max": int(probes.max()),
+        "path_mean": float(path.mean()),
+        "path_p95": float(np.percentile(path, 95)),
+        "path_max": float(path.max()),
+        "error_mean": float(np.nanmean(error)) if found.any() else float("nan"),
+    }
+
+
+def evaluate_strategies(
+    strategies: List[str], prior: Prior, trials: int = 10000, start: float = 0.0, step: float = 0.1,
+    max_range: float = 2.0, tol: float = 0.05, workers: Optional[int] = None, chunk: int = 1000,
+    seed: int = 0, worst_case_grid: int = 2001,
+) -> Dict[str, Dict[str, object]]:
+    """
+    Compara estrategias con objetivos muestreados del prior (los mismos para
+    todas) en un pool de procesos: costo esperado (media, p95) y máximo
+    observado de palpados y recorrido. El peor caso se mide además en forma
+    determinista sobre `worst_case_grid` objetivos equiespaciados en el rango.
+    Los objetivos fuera de [start - max_range, start + max_range] cuentan como
+    fallos para todas las estrategias.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(-(-trials // chunk))
+    chunks = []
+    for k, sq in enumerate(seeds):
+        n = min(chunk, trials - k * chunk)
+        chunks.append(prior.sample(np.random.default_rng(sq), n))
+    grid = np.linspace(start - max_range, start + max_range, worst_case_grid)
+    report: Dict[str, Dict[str, object]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: ([pool.submit(_evaluate_chunk, name, t, start, step, max_range, tol, prior) for t in chunks],
+                          pool.submit(_evaluate_chunk, name, grid, start, step, max_range, tol, prior))
+                   for name in strategies}
+        for name, (mc, worst) in futures.items():
+            report[name] = {"expected": _summary([f.result() for f in mc]),
+                            "worst_case": _summary([worst.result()])}
+    return report
+
+
+def print_strategy_report(report: Dict[str, Dict[str, object]]) -> None:
+    print(f"{'estrategia':15s} {'éxito':>6s} {'palp. media':>11s} {'palp. p95':>9s} {'palp. peor':>10s} "
+          f"{'recorr. media':>13s} {'recorr. p95':>11s} {'recorr. peor':>12s} {'error medio':>11s}")
+    for name, r in report.items():
+        e, w = r["expected"], r["worst_case"]
+        print(f"{name:15s} {e['success_rate']:6.3f} {e['probes_mean']:11.2f} {e['probes_p95']:9.1f} "
+              f"{w['probes_max']:10d} {e['path_mean']:13.3f} {e['path_p95']:11.3f} {w['path_max']:12.3f} "
+              f"{e['error_mean']:11.4f}")
 
 
 def main():
@@ -68,15 +619,80 @@ def main():
     parser.add_argument("--step", type=float, default=0.1, help="Paso ΔH de exploración (default: 0.1)")
     parser.add_argument("--max-range", type=float, default=2.0, help="Rango máximo a explorar desde B (default: 2.0)")
     parser.add_argument("--json", action="store_true", help="Imprime la salida en JSON")
+    parser.add_argument("--batch-csv", metavar="ARCHIVO",
+                        help="Resuelve en lote los casos de un CSV (start,target,tolerance,step; '-' = stdin) "
+                             "y escribe los resultados en CSV")
+    parser.add_argument("--method", choices=list(BATCH_METHODS), default="closed_form",
+                        help="Modo del lote: closed_form (default) o scan")
+    parser.add_argument("--bench-batch", type=int, metavar="N",
+                        help="Compara el bucle escalar con los modos en lote sobre N casos aleatorios")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="symmetric",
+                        help="Estrategia de palpado (default: symmetric, el patrón start, +Δ, -Δ, ...)")
+    parser.add_argument("--prior", choices=["uniform", "gaussian"], default="uniform",
+                        help="Forma del prior sobre la posición del objetivo (default: uniform)")
+    parser.add_argument("--prior-mean", type=float, default=None, help="Media del prior (default: --start)")
+    parser.add_argument("--prior-spread", type=float, default=None,
+                        help="Semiancho (uniform) o desvío (gaussian) del prior (default: --max-range)")
+    parser.add_argument("--compare-strategies", type=int, metavar="N",
+                        help="Evalúa todas las estrategias con N objetivos muestreados del prior (Monte Carlo)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para --compare-strategies")
+    parser.add_argument("--heads", type=int, metavar="N",
+                        help="Simula N cabezales asíncronos concurrentes y mide el rendimiento")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Latencia simulada por palpado (default: 5)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variación uniforme de la latencia (default: 0)")
     args = parser.parse_args()
+    prior = Prior(args.prior,
+                  args.start if args.prior_mean is None else args.prior_mean,
+                  args.max_range if args.prior_spread is None else args.prior_spread)
+
+    if args.compare_strategies:
+        report = evaluate_strategies(list(STRATEGIES), prior, args.compare_strategies, args.start,
+                                     args.step, args.max_range, args.tolerance, args.workers)
+        if args.json:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            print(f"Prior: {prior.kind} (media {prior.mean}, dispersión {prior.spread})  "
+                  f"Paso: {args.step}  Tolerancia: ±{args.tolerance}  Ensayos: {args.compare_strategies}")
+            print_strategy_report(report)
+        return
+    if args.heads:
+        stats = measure_async_throughput(args.heads, args.latency_ms / 1000, args.jitter_ms / 1000,
+                                         args.step, args.max_range, args.tolerance, args.strategy)
+        if args.json:
+            print(json.dumps(stats, ensure_ascii=False, indent=2))
+        else:
+            print(f"Cabezales: {stats['heads']}  Encontrados: {stats['found']}  Palpados: {stats['probes']}")
+            print(f"  Tiempo real      : {stats['wall_s']:.3f} s ({stats['probes_per_s']:.1f} palpados/s)")
+            print(f"  En serie serían  : {stats['sequential_s']:.3f} s")
+        return
+
+    if args.batch_csv:
+        cases = read_batch_csv(args.batch_csv)
+        result = batch_line_search(cases["start"], cases["target"], cases["tolerance"], cases["step"],
+                                   args.max_range, args.method)
+        write_batch_csv(cases, result)
+        return
+    if args.bench_batch:
+        timings = benchmark_batch(args.bench_batch, args.max_range)
+        if args.json:
+            print(json.dumps(timings, ensure_ascii=False, indent=2))
+        else:
+            print(f"Casos: {timings['cases']}")
+            for key in ("loop_ms", "scan_ms", "closed_form_ms"):
+                print(f"  {key:16s}: {timings[key]:10.2f} ms  (x{timings['loop_ms'] / timings[key]:.1f})")
+        return
 
     sensor = make_sensor(args.target, args.tolerance)
-    result = exhaustive_line_search(
-        start=args.start,
-        sense=sensor,
-        step=args.step,
-        max_range=args.max_range,
-    )
+    if args.strategy == "symmetric":
+        result = exhaustive_line_search(
+            start=args.start,
+            sense=sensor,
+            step=args.step,
+            max_range=args.max_range,
+        )
+    else:
+        strategy = STRATEGIES[args.strategy](args.start, args.step, args.max_range, args.tolerance, prior)
+        result = drive_scan(strategy, sensor, args.start, keep_visited=True)
 
     if args.json:
         print(json.dumps(result.__dict__, ensure_ascii=False, indent=2))
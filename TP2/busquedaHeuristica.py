@@ -1,8 +1,21 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Tuple, Optional, Dict
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, List, Tuple, Optional, Dict, Union
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from multiprocessing import shared_memory
 import heapq
+import math
+import os
+import random
+import statistics
+import struct
+import sys
 import time
+import tracemalloc
+import zlib
 import argparse
 import json
 
@@ -15,10 +28,31 @@ class SearchResult:
     cost: float
     expanded: int
     runtime_ms: float
+    bound: float = 1.0  # cota de suboptimalidad garantizada (costo <= bound * óptimo)
+    stats: Optional["SearchStats"] = None  # sólo si la búsqueda se instrumentó (SearchProbe)
+
+SQRT2 = math.sqrt(2)
+INF = float("inf")
 
 def manhattan(a: Coord, b: Coord) -> int:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
+def octile(a: Coord, b: Coord) -> float:
+    di, dj = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return max(di, dj) + (SQRT2 - 1) * min(di, dj)
+
+def heuristic_for(connectivity: int):
+    if connectivity not in (4, 8):
+        raise ValueError(f"Conectividad no soportada: {connectivity} (opciones: 4, 8)")
+    return manhattan if connectivity == 4 else octile
+
+def step_cost(a: Coord, b: Coord) -> float:
+    # 1 en movimientos rectos, √2 en diagonales
+    return 1 if a[0] == b[0] or a[1] == b[1] else SQRT2
+
+def path_cost(path: List[Coord]) -> float:
+    return sum(step_cost(a, b) for a, b in zip(path, path[1:]))
+
 def reconstruct_path(came_from: Dict[Coord, Coord], current: Coord) -> List[Coord]:
     path = [current]
     while current in came_from:
@@ -27,7 +61,7 @@ def reconstruct_path(came_from: Dict[Coord, Coord], current: Coord) -> List[Coor
     path.reverse()
     return path
 
-def neighbors(p: Coord, grid: List[str]) -> List[Coord]:
+def neighbors(p: Coord, grid: List[str], connectivity: int = 4) -> List[Coord]:
     h, w = len(grid), len(grid[0])
     i, j = p
     cand = [(i-1,j), (i+1,j), (i,j-1), (i,j+1)]
@@ -35,73 +69,1236 @@ def neighbors(p: Coord, grid: List[str]) -> List[Coord]:
     for x,y in cand:
         if 0 <= x < h and 0 <= y < w and grid[x][y] != '#':  # '#' = obstáculo
             out.append((x,y))
+    if connectivity == 8:
+        # Diagonales sin cortar esquinas: ambas celdas ortogonales libres
+        for di, dj in ((-1,-1), (-1,1), (1,-1), (1,1)):
+            x, y = i + di, j + dj
+            if (0 <= x < h and 0 <= y < w and grid[x][y] != '#'
+                    and grid[x][j] != '#' and grid[i][y] != '#'):
+                out.append((x,y))
     return out
 
-def greedy_best_first(grid: List[str], start: Coord, goal: Coord) -> SearchResult:
+@dataclass
+class SearchStats:
+    pushes: int = 0          # inserciones en la lista abierta
+    pops: int = 0            # extracciones (expansiones + entradas viejas)
+    stale_pops: int = 0      # extracciones de nodos ya cerrados (duplicados)
+    reopened: int = 0        # mejoras de g sobre nodos ya cerrados
+    peak_open: int = 0       # tamaño máximo de la lista abierta
+    pop_ms: Optional[float] = None        # tiempos por fase (sólo con timers)
+    push_ms: Optional[float] = None
+    neighbors_ms: Optional[float] = None  # None en el grid compilado (vecinos en línea)
+    other_ms: Optional[float] = None
+    peak_mem_kb: Optional[float] = None   # sólo con memory (tracemalloc)
+
+@dataclass
+class SearchProbe:
+    """
+    Instrumentación opcional de `greedy_best_first` y `astar`. Los contadores
+    se calculan siempre (casi sin costo); `timers` reemplaza las operaciones
+    de heap y la generación de vecinos por versiones cronometradas, `memory`
+    mide el pico con tracemalloc y `on_expand(celda, valor, orden)` se llama
+    en cada expansión (valor = g en A*, h en Greedy).
+    """
+    timers: bool = False
+    memory: bool = False
+    on_expand: Optional[Callable[[Coord, float, int], None]] = None
+
+class _PhaseTimers:
+    # Versiones cronometradas de heappush/heappop/neighbors (sólo con timers=True)
+    def __init__(self):
+        self.push_s = self.pop_s = self.neighbors_s = 0.0
+
+    def push(self, pq, item, _push=heapq.heappush, _clock=time.perf_counter):
+        t = _clock()
+        _push(pq, item)
+        self.push_s += _clock() - t
+
+    def pop(self, pq, _pop=heapq.heappop, _clock=time.perf_counter):
+        t = _clock()
+        item = _pop(pq)
+        self.pop_s += _clock() - t
+        return item
+
+    def neighbors(self, p, grid, connectivity, _clock=time.perf_counter):
+        t = _clock()
+        nbs = neighbors(p, grid, connectivity)
+        self.neighbors_s += _clock() - t
+        return nbs
+
+def _heap_ops(probe: Optional[SearchProbe]):
+    if probe is not None and probe.timers:
+        timers = _PhaseTimers()
+        return timers.push, timers.pop, timers
+    return heapq.heappush, heapq.heappop, None
+
+def _finish(res: SearchResult, probe: Optional[SearchProbe], pushes: int, left: int,
+            reopened: int, peak_open: int, timers: Optional[_PhaseTimers], compiled: bool) -> SearchResult:
+    # Completa SearchResult.stats; pops y duplicados salen de los empujes y lo que quedó en la cola
+    if probe is None:
+        return res
+    pops = pushes - left
+    st = SearchStats(pushes=pushes, pops=pops, stale_pops=pops - res.expanded,
+                     reopened=reopened, peak_open=peak_open)
+    if timers is not None:
+        st.pop_ms = timers.pop_s * 1000
+        st.push_ms = timers.push_s * 1000
+        st.neighbors_ms = None if compiled else timers.neighbors_s * 1000
+        st.other_ms = res.runtime_ms - st.pop_ms - st.push_ms - (st.neighbors_ms or 0.0)
+    res.stats = st
+    return res
+
+def _with_memory(search, probe: Optional[SearchProbe]) -> SearchResult:
+    if probe is None or not probe.memory:
+        return search()
+    nested = tracemalloc.is_tracing()
+    if nested:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    else:
+        tracemalloc.start()
+        base = 0
+    try:
+        res = search()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        if not nested:
+            tracemalloc.stop()
+    res.stats.peak_mem_kb = peak / 1024
+    return res
+
+def greedy_best_first(grid: Union[List[str], "CompiledGrid"], start: Coord, goal: Coord,
+                      connectivity: int = 4, probe: Optional[SearchProbe] = None) -> SearchResult:
+    h = heuristic_for(connectivity)
+    if isinstance(grid, CompiledGrid):
+        _require_4(connectivity)
+        return _with_memory(lambda: _greedy_compiled(grid, start, goal, probe), probe)
+    return _with_memory(lambda: _greedy_list(grid, start, goal, connectivity, h, probe), probe)
+
+def _greedy_list(grid: List[str], start: Coord, goal: Coord, connectivity: int, h,
+                 probe: Optional[SearchProbe]) -> SearchResult:
+    push, pop, timers = _heap_ops(probe)
+    nbrs = timers.neighbors if timers is not None else neighbors
+    on_expand = probe.on_expand if probe is not None else None
     t0 = time.perf_counter()
-    pq: List[Tuple[int, int, Coord]] = []  # (h, tie, node)
+    pq: List[Tuple[float, int, Coord]] = []  # (h, tie, node)
     tie = 0
-    heapq.heappush(pq, (manhattan(start, goal), tie, start))
+    push(pq, (h(start, goal), tie, start))
     came_from: Dict[Coord, Coord] = {}
     visited = set()
     expanded = 0
+    peak_open = 1
 
     while pq:
-        _, _, current = heapq.heappop(pq)
+        hv, _, current = pop(pq)
         if current in visited:
             continue
         visited.add(current)
         expanded += 1
+        if on_expand is not None:
+            on_expand(current, hv, expanded)
 
         if current == goal:
             path = reconstruct_path(came_from, current)
             dt = (time.perf_counter() - t0) * 1000
-            return SearchResult("Greedy Best-First", path, cost=len(path)-1, expanded=expanded, runtime_ms=dt)
+            res = SearchResult("Greedy Best-First", path, cost=path_cost(path), expanded=expanded, runtime_ms=dt)
+            return _finish(res, probe, tie + 1, len(pq), 0, peak_open, timers, False)
 
-        for nb in neighbors(current, grid):
+        for nb in nbrs(current, grid, connectivity):
             if nb in visited: 
                 continue
             if nb not in came_from:
                 came_from[nb] = current
             tie += 1
-            heapq.heappush(pq, (manhattan(nb, goal), tie, nb))
+            push(pq, (h(nb, goal), tie, nb))
+        if len(pq) > peak_open:
+            peak_open = len(pq)
 
     dt = (time.perf_counter() - t0) * 1000
-    return SearchResult("Greedy Best-First", [], cost=float("inf"), expanded=expanded, runtime_ms=dt)
+    res = SearchResult("Greedy Best-First", [], cost=float("inf"), expanded=expanded, runtime_ms=dt)
+    return _finish(res, probe, tie + 1, 0, 0, peak_open, timers, False)
 
-def astar(grid: List[str], start: Coord, goal: Coord) -> SearchResult:
+def astar(grid: Union[List[str], "CompiledGrid"], start: Coord, goal: Coord,
+          connectivity: int = 4, probe: Optional[SearchProbe] = None) -> SearchResult:
+    h = heuristic_for(connectivity)
+    if isinstance(grid, CompiledGrid):
+        _require_4(connectivity)
+        return _with_memory(lambda: _astar_compiled(grid, start, goal, probe), probe)
+    return _with_memory(lambda: _astar_list(grid, start, goal, connectivity, h, probe), probe)
+
+def _astar_list(grid: List[str], start: Coord, goal: Coord, connectivity: int, h,
+                probe: Optional[SearchProbe]) -> SearchResult:
+    push, pop, timers = _heap_ops(probe)
+    nbrs = timers.neighbors if timers is not None else neighbors
+    on_expand = probe.on_expand if probe is not None else None
     t0 = time.perf_counter()
-    pq: List[Tuple[int, int, Coord]] = []  # (f=g+h, tie, node)
+    pq: List[Tuple[float, int, Coord]] = []  # (f=g+h, tie, node)
     tie = 0
-    g: Dict[Coord, int] = {start: 0}
+    g: Dict[Coord, float] = {start: 0}
     came_from: Dict[Coord, Coord] = {}
-    heapq.heappush(pq, (manhattan(start, goal), tie, start))
+    push(pq, (h(start, goal), tie, start))
     closed = set()
     expanded = 0
+    reopened = 0
+    peak_open = 1
 
     while pq:
-        f, _, current = heapq.heappop(pq)
+        f, _, current = pop(pq)
         if current in closed:
             continue
         closed.add(current)
         expanded += 1
+        if on_expand is not None:
+            on_expand(current, g[current], expanded)
 
         if current == goal:
             path = reconstruct_path(came_from, current)
             dt = (time.perf_counter() - t0) * 1000
-            return SearchResult("A*", path, cost=g[current], expanded=expanded, runtime_ms=dt)
+            res = SearchResult("A*", path, cost=g[current], expanded=expanded, runtime_ms=dt)
+            return _finish(res, probe, tie + 1, len(pq), reopened, peak_open, timers, False)
 
-        for nb in neighbors(current, grid):
-            tentative_g = g[current] + 1  # costo unitario por movimiento
+        for nb in nbrs(current, grid, connectivity):
+            tentative_g = g[current] + step_cost(current, nb)  # 1 recto, √2 diagonal
             if nb not in g or tentative_g < g[nb]:
+                if nb in closed:
+                    reopened += 1
                 g[nb] = tentative_g
                 came_from[nb] = current
                 tie += 1
-                f_nb = tentative_g + manhattan(nb, goal)
-                heapq.heappush(pq, (f_nb, tie, nb))
+                f_nb = tentative_g + h(nb, goal)
+                push(pq, (f_nb, tie, nb))
+        if len(pq) > peak_open:
+            peak_open = len(pq)
 
     dt = (time.perf_counter() - t0) * 1000
-    return SearchResult("A*", [], cost=float("inf"), expanded=expanded, runtime_ms=dt)
+    res = SearchResult("A*", [], cost=float("inf"), expanded=expanded, runtime_ms=dt)
+    return _finish(res, probe, tie + 1, 0, reopened, peak_open, timers, False)
+
+_PASSABLE_TABLE = bytes(0 if c == ord('#') else 1 for c in range(256))
+
+class CompiledGrid:
+    """
+    Grid compilado para búsquedas repetidas sobre el mismo mapa:
+      - máscara de celdas transitables en un bytearray, con un borde de
+        obstáculos alrededor (los vecinos se obtienen sin chequear límites)
+      - nodos como enteros id = (i+1)*(w+2) + (j+1) y desplazamientos de
+        vecinos precalculados
+      - g, padre y estado cerrado en arreglos planos reutilizados entre
+        consultas mediante un contador de generación
+    """
+    def __init__(self, grid: List[str]):
+        self.h, self.w = len(grid), len(grid[0])
+        self.stride = self.w + 2
+        size = (self.h + 2) * self.stride
+        self.passable = bytearray(size)
+        for i, row in enumerate(grid):
+            base = (i + 1) * self.stride + 1
+            # '#' = obstáculo -> 0, cualquier otro carácter -> 1
+            self.passable[base:base + self.w] = row.encode("latin-1").translate(_PASSABLE_TABLE)
+        self._init_search_arrays()
+
+    @classmethod
+    def from_mask(cls, h: int, w: int, mask) -> "CompiledGrid":
+        # Reutiliza una máscara ya compilada (p. ej. un memoryview sobre memoria
+        # compartida) sin copiarla; sólo se crean los arreglos de búsqueda
+        cg = cls.__new__(cls)
+        cg.h, cg.w = h, w
+        cg.stride = w + 2
+        if len(mask) != (h + 2) * cg.stride:
+            raise ValueError(f"La máscara debe tener {(h + 2) * cg.stride} bytes")
+        cg.passable = mask
+        cg._init_search_arrays()
+        return cg
+
+    def _init_search_arrays(self) -> None:
+        size = len(self.passable)
+        # Mismo orden que neighbors(): arriba, abajo, izquierda, derecha
+        self.offsets = (-self.stride, self.stride, -1, 1)
+        self.g = array('d', bytes(8 * size))
+        self.parent = array('i', bytes(4 * size))
+        self.seen = array('I', bytes(4 * size))    # generación en que se vio el nodo
+        self.closed = array('I', bytes(4 * size))  # generación en que se cerró el nodo
+        self.generation = 0
+
+    def node(self, p: Coord) -> int:
+        return (p[0] + 1) * self.stride + p[1] + 1
+
+    def coord(self, n: int) -> Coord:
+        i, j = divmod(n, self.stride)
+        return (i - 1, j - 1)
+
+    def is_passable(self, p: Coord) -> bool:
+        return bool(self.passable[self.node(p)])
+
+    def set_passable(self, p: Coord, passable: bool) -> None:
+        if not (0 <= p[0] < self.h and 0 <= p[1] < self.w):
+            raise IndexError(f"Celda fuera del grid: {p}")
+        self.passable[self.node(p)] = 1 if passable else 0
+
+    def new_query(self) -> int:
+        self.generation += 1
+        if self.generation >= 2**32:
+            # Desborde del contador: se limpian las marcas y se reinicia
+            size = len(self.passable)
+            self.seen = array('I', bytes(4 * size))
+            self.closed = array('I', bytes(4 * size))
+            self.generation = 1
+        return self.generation
+
+    def path_to(self, n: int) -> List[Coord]:
+        path = [self.coord(n)]
+        while self.parent[n] >= 0:
+            n = self.parent[n]
+            path.append(self.coord(n))
+        path.reverse()
+        return path
+
+def _greedy_compiled(cg: CompiledGrid, start: Coord, goal: Coord,
+                     probe: Optional[SearchProbe] = None) -> SearchResult:
+    push, pop, timers = _heap_ops(probe)
+    on_expand = probe.on_expand if probe is not None else None
+    t0 = time.perf_counter()
+    gen = cg.new_query()
+    passable, offsets, parent, seen, closed = cg.passable, cg.offsets, cg.parent, cg.seen, cg.closed
+    stride = cg.stride
+    gi, gj = goal[0] + 1, goal[1] + 1
+    s, t = cg.node(start), cg.node(goal)
+    seen[s] = gen
+    parent[s] = -1
+    pq: List[Tuple[int, int, int]] = [(manhattan(start, goal), 0, s)]  # (h, tie, node)
+    tie = 0
+    expanded = 0
+    peak_open = 1
+
+    while pq:
+        hv, _, current = pop(pq)
+        if closed[current] == gen:
+            continue
+        closed[current] = gen
+        expanded += 1
+        if on_expand is not None:
+            on_expand(cg.coord(current), hv, expanded)
+
+        if current == t:
+            path = cg.path_to(current)
+            dt = (time.perf_counter() - t0) * 1000
+            res = SearchResult("Greedy Best-First", path, cost=len(path)-1, expanded=expanded, runtime_ms=dt)
+            return _finish(res, probe, tie + 1, len(pq), 0, peak_open, timers, True)
+
+        for off in offsets:
+            nb = current + off
+            if not passable[nb] or closed[nb] == gen:
+                continue
+            if seen[nb] != gen:
+                seen[nb] = gen
+                parent[nb] = current
+            tie += 1
+            i, j = divmod(nb, stride)
+            push(pq, (abs(i - gi) + abs(j - gj), tie, nb))
+        if len(pq) > peak_open:
+            peak_open = len(pq)
+
+    dt = (time.perf_counter() - t0) * 1000
+    res = SearchResult("Greedy Best-First", [], cost=float("inf"), expanded=expanded, runtime_ms=dt)
+    return _finish(res, probe, tie + 1, 0, 0, peak_open, timers, True)
+
+def _astar_compiled(cg: CompiledGrid, start: Coord, goal: Coord,
+                    probe: Optional[SearchProbe] = None) -> SearchResult:
+    push, pop, timers = _heap_ops(probe)
+    on_expand = probe.on_expand if probe is not None else None
+    t0 = time.perf_counter()
+    gen = cg.new_query()
+    passable, offsets, g, parent, seen, closed = cg.passable, cg.offsets, cg.g, cg.parent, cg.seen, cg.closed
+    stride = cg.stride
+    gi, gj = goal[0] + 1, goal[1] + 1
+    s, t = cg.node(start), cg.node(goal)
+    seen[s] = gen
+    g[s] = 0
+    parent[s] = -1
+    pq: List[Tuple[int, int, int]] = [(manhattan(start, goal), 0, s)]  # (f=g+h, tie, node)
+    tie = 0
+    expanded = 0
+    reopened = 0
+    peak_open = 1
+
+    while pq:
+        _, _, current = pop(pq)
+        if closed[current] == gen:
+            continue
+        closed[current] = gen
+        expanded += 1
+        if on_expand is not None:
+            on_expand(cg.coord(current), g[current], expanded)
+
+        if current == t:
+            path = cg.path_to(current)
+            dt = (time.perf_counter() - t0) * 1000
+            res = SearchResult("A*", path, cost=int(g[current]), expanded=expanded, runtime_ms=dt)
+            return _finish(res, probe, tie + 1, len(pq), reopened, peak_open, timers, True)
+
+        tentative_g = g[current] + 1  # costo unitario por movimiento
+        for off in offsets:
+            nb = current + off
+            if not passable[nb]:
+                continue
+            if seen[nb] != gen or tentative_g < g[nb]:
+                if closed[nb] == gen:
+                    reopened += 1
+                seen[nb] = gen
+                g[nb] = tentative_g
+                parent[nb] = current
+                tie += 1
+                i, j = divmod(nb, stride)
+                push(pq, (int(tentative_g) + abs(i - gi) + abs(j - gj), tie, nb))
+        if len(pq) > peak_open:
+            peak_open = len(pq)
+
+    dt = (time.perf_counter() - t0) * 1000
+    res = SearchResult("A*", [], cost=float("inf"), expanded=expanded, runtime_ms=dt)
+    return _finish(res, probe, tie + 1, 0, reopened, peak_open, timers, True)
+
+def _require_4(connectivity: int) -> None:
+    if connectivity != 4:
+        raise ValueError("El grid compilado sólo admite conectividad 4")
+
+def _jump(cg: CompiledGrid, n: int, di: int, dj: int, goal: int, connectivity: int) -> Optional[int]:
+    """
+    Avanza desde la celda `n` (ya un paso en la dirección (di, dj)) hasta el
+    próximo punto de salto: la meta, una celda con vecinos forzados o, en
+    movimientos compuestos, una celda desde la que un salto secundario
+    encuentra un punto de salto. Devuelve None si choca con un obstáculo.
+    """
+    P, S = cg.passable, cg.stride
+    step = di * S + dj
+    while True:
+        if not P[n]:
+            return None
+        if n == goal:
+            return n
+        if connectivity == 4:
+            if dj:
+                # Orden canónico "horizontal primero": desde un tramo horizontal
+                # se puede girar en vertical en cualquier celda
+                if (_jump(cg, n - S, -1, 0, goal, 4) is not None
+                        or _jump(cg, n + S, 1, 0, goal, 4) is not None):
+                    return n
+            else:
+                # Un tramo vertical sólo gira si la celda lateral está libre y
+                # la lateral anterior bloqueada
+                prev = n - step
+                if (P[n + 1] and not P[prev + 1]) or (P[n - 1] and not P[prev - 1]):
+                    return n
+        elif di and dj:
+            if (_jump(cg, n + dj, 0, dj, goal, 8) is not None
+                    or _jump(cg, n + di * S, di, 0, goal, 8) is not None):
+                return n
+        elif dj:
+            if (P[n - S] and not P[n - dj - S]) or (P[n + S] and not P[n - dj + S]):
+                return n
+        else:
+            if (P[n - 1] and not P[n - 1 - di * S]) or (P[n + 1] and not P[n + 1 - di * S]):
+                return n
+        # Sin cortar esquinas: en diagonal ambas celdas ortogonales deben estar libres
+        if di and dj and not (P[n + dj] and P[n + di * S]):
+            return None
+        n += step
+
+def _jps_directions(cg: CompiledGrid, n: int, d: Optional[Tuple[int, int]], connectivity: int) -> List[Tuple[int, int]]:
+    # Direcciones de los vecinos no podados de `n` según la dirección de llegada `d`
+    P, S = cg.passable, cg.stride
+    if d is None:
+        dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        if connectivity == 8:
+            dirs += [(di, dj) for di in (-1, 1) for dj in (-1, 1) if P[n + dj] and P[n + di * S]]
+        return dirs
+    di, dj = d
+    if connectivity == 4:
+        if dj:
+            return [(0, dj), (-1, 0), (1, 0)]
+        out = [(di, 0)]
+        for side in (-1, 1):
+            if P[n + side] and not P[n - di * S + side]:
+                out.append((0, side))
+        return out
+    if di and dj:
+        walk_i, walk_j = P[n + di * S], P[n + dj]
+        out = []
+        if walk_i:
+            out.append((di, 0))
+        if walk_j:
+            out.append((0, dj))
+        if walk_i and walk_j:
+            out.append((di, dj))
+        return out
+    out = []
+    if dj:
+        nxt, down, up = P[n + dj], P[n + S], P[n - S]
+        if nxt:
+            out.append((0, dj))
+            if down:
+                out.append((1, dj))
+            if up:
+                out.append((-1, dj))
+        if down:
+            out.append((1, 0))
+        if up:
+            out.append((-1, 0))
+    else:
+        nxt, right, left = P[n + di * S], P[n + 1], P[n - 1]
+        if nxt:
+            out.append((di, 0))
+            if right:
+                out.append((di, 1))
+            if left:
+                out.append((di, -1))
+        if right:
+            out.append((0, 1))
+        if left:
+            out.append((0, -1))
+    return out
+
+def _sign(v: int) -> int:
+    return (v > 0) - (v < 0)
+
+def jump_point_search(grid: Union[List[str], CompiledGrid], start: Coord, goal: Coord,
+                      connectivity: int = 4) -> SearchResult:
+    """
+    Jump Point Search para grids de costo uniforme (4 u 8 vecinos, sin cortar
+    esquinas). Poda los caminos simétricos y sólo inserta en la cola los
+    puntos de salto; el costo es el mismo que el óptimo de A*. El camino se
+    devuelve completo (celda a celda), como en las otras búsquedas.
+    """
+    h = heuristic_for(connectivity)
+    cg = grid if isinstance(grid, CompiledGrid) else CompiledGrid(grid)
+    t0 = time.perf_counter()
+    gen = cg.new_query()
+    g, parent, seen, closed = cg.g, cg.parent, cg.seen, cg.closed
+    S = cg.stride
+    s, t = cg.node(start), cg.node(goal)
+    seen[s] = gen
+    g[s] = 0
+    parent[s] = -1
+    pq: List[Tuple[float, int, int]] = [(h(start, goal), 0, s)]  # (f=g+h, tie, nodo)
+    tie = 0
+    expanded = 0
+
+    while pq:
+        _, _, current = heapq.heappop(pq)
+        if closed[current] == gen:
+            continue
+        closed[current] = gen
+        expanded += 1
+
+        if current == t:
+            jumps = cg.path_to(current)
+            path = jumps[:1]
+            for a, b in zip(jumps, jumps[1:]):
+                si, sj = _sign(b[0] - a[0]), _sign(b[1] - a[1])
+                x = a
+                while x != b:
+                    x = (x[0] + si, x[1] + sj)
+                    path.append(x)
+            dt = (time.perf_counter() - t0) * 1000
+            cost = int(g[current]) if g[current].is_integer() else g[current]
+            return SearchResult("JPS", path, cost=cost, expanded=expanded, runtime_ms=dt)
+
+        ci, cj = cg.coord(current)
+        d = None
+        if parent[current] >= 0:
+            pi, pj = cg.coord(parent[current])
+            d = (_sign(ci - pi), _sign(cj - pj))
+        for di, dj in _jps_directions(cg, current, d, connectivity):
+            jp = _jump(cg, current + di * S + dj, di, dj, t, connectivity)
+            if jp is None or closed[jp] == gen:
+                continue
+            ji, jj = cg.coord(jp)
+            tentative_g = g[current] + octile((ci, cj), (ji, jj))
+            if seen[jp] != gen or tentative_g < g[jp]:
+                seen[jp] = gen
+                g[jp] = tentative_g
+                parent[jp] = current
+                tie += 1
+                heapq.heappush(pq, (tentative_g + h((ji, jj), goal), tie, jp))
+
+    dt = (time.perf_counter() - t0) * 1000
+    return SearchResult("JPS", [], cost=float("inf"), expanded=expanded, runtime_ms=dt)
+
+def ara_star(grid: Union[List[str], CompiledGrid], start: Coord, goal: Coord, connectivity: int = 4,
+             eps0: float = 3.0, eps_step: float = 0.5, deadline_ms: Optional[float] = None,
+             max_expanded: Optional[int] = None):
+    """
+    ARA* (Likhachev et al.): A* ponderado con f = g + eps*h y eps decreciente.
+    Genera un `SearchResult` al final de cada iteración (mismo costo o menor,
+    con una cota más ajustada); `bound` es la cota de
+    suboptimalidad vigente (min(eps, costo / min(g+h) de los nodos abiertos o
+    inconsistentes)). Entre iteraciones conserva g y los padres: sólo se
+    reabren los nodos abiertos o mejorados tras cerrarse. Se detiene al llegar
+    a eps = 1 o al agotar `deadline_ms` / `max_expanded` (el último resultado
+    generado es el mejor disponible: si la iteración cortada ya mejoró la
+    meta, se genera ese camino con la cota recalculada).
+    """
+    _require_4(connectivity)
+    cg = grid if isinstance(grid, CompiledGrid) else CompiledGrid(grid)
+    t0 = time.perf_counter()
+    deadline = t0 + deadline_ms / 1000 if deadline_ms is not None else None
+    P, offsets, S = cg.passable, cg.offsets, cg.stride
+    s, t = cg.node(start), cg.node(goal)
+    gi, gj = goal[0] + 1, goal[1] + 1
+
+    def h(n: int) -> int:
+        i, j = divmod(n, S)
+        return abs(i - gi) + abs(j - gj)
+
+    g: Dict[int, float] = {s: 0}
+    parent: Dict[int, int] = {s: -1}
+    open_nodes = {s}
+    incons: set = set()
+    expanded = 0
+    tie = 0
+    eps = eps0
+
+    def path_to(n: int) -> List[Coord]:
+        path = [cg.coord(n)]
+        while parent[n] >= 0:
+            n = parent[n]
+            path.append(cg.coord(n))
+        path.reverse()
+        return path
+
+    def out_of_budget() -> bool:
+        return ((max_expanded is not None and expanded >= max_expanded)
+                or (deadline is not None and time.perf_counter() >= deadline))
+
+    def result(eps_bound: float) -> SearchResult:
+        # Los padres pueden haber mejorado después: el camino cuesta <= g(meta).
+        # La cota también se acota con min(g+h) de los abiertos e inconsistentes
+        path = path_to(t)
+        cost = len(path) - 1
+        lower = min((g[n] + h(n) for n in open_nodes | incons), default=cost)
+        bound = min(eps_bound, cost / lower) if lower > 0 else 1.0
+        dt = (time.perf_counter() - t0) * 1000
+        return SearchResult("ARA*", path, cost=cost, expanded=expanded, runtime_ms=dt, bound=max(bound, 1.0))
+
+    last_cost, last_eps = INF, INF
+    while True:
+        # ImprovePath con el eps actual; CLOSED se vacía en cada iteración
+        pq = [(g[n] + eps * h(n), g[n], n) for n in open_nodes]
+        heapq.heapify(pq)
+        closed: set = set()
+        finished = True
+        while pq and g.get(t, INF) > pq[0][0]:
+            if out_of_budget():
+                finished = False
+                break
+            _, gn, n = heapq.heappop(pq)
+            if n in closed or gn != g[n]:
+                continue  # entrada vieja
+            open_nodes.discard(n)
+            closed.add(n)
+            expanded += 1
+            ng = gn + 1
+            for off in offsets:
+                nb = n + off
+                if P[nb] and ng < g.get(nb, INF):
+                    g[nb] = ng
+                    parent[nb] = n
+                    if nb in closed:
+                        incons.add(nb)
+                    else:
+                        open_nodes.add(nb)
+                        tie += 1
+                        heapq.heappush(pq, (ng + eps * h(nb), ng, nb))
+        cost = g.get(t, INF)
+        if not finished:
+            # La iteración cortada pudo mejorar la meta: ese camino vale la
+            # cota de la última iteración completa (su costo no es mayor)
+            if cost < INF and len(path_to(t)) - 1 < last_cost:
+                yield result(last_eps)
+            elif last_cost == INF:
+                # Presupuesto agotado antes de la primera solución
+                dt = (time.perf_counter() - t0) * 1000
+                yield SearchResult("ARA*", [], cost=INF, expanded=expanded, runtime_ms=dt, bound=INF)
+            return
+        if cost == INF:
+            # La cola se agotó: todo nodo alcanzable ya fue expandido alguna vez
+            # (los inconsistentes también), así que la meta es inalcanzable
+            dt = (time.perf_counter() - t0) * 1000
+            yield SearchResult("ARA*", [], cost=INF, expanded=expanded, runtime_ms=dt, bound=INF)
+            return
+        res = result(eps)
+        last_cost, last_eps = res.cost, eps
+        yield res
+        if res.bound <= 1.0 or out_of_budget():
+            return
+        eps = max(1.0, eps - eps_step)
+        open_nodes |= incons
+        incons = set()
+
+def anytime_astar(grid: Union[List[str], CompiledGrid], start: Coord, goal: Coord, connectivity: int = 4,
+                  eps0: float = 3.0, eps_step: float = 0.5, deadline_ms: Optional[float] = None,
+                  max_expanded: Optional[int] = None) -> SearchResult:
+    # Mejor solución de ARA* dentro del presupuesto (sin presupuesto: óptima, bound = 1)
+    best = None
+    for best in ara_star(grid, start, goal, connectivity, eps0, eps_step, deadline_ms, max_expanded):
+        pass
+    return best
+
+# Algoritmos disponibles para la comparación y los benchmarks
+ALGORITHMS = {
+    "greedy": greedy_best_first,
+    "astar": astar,
+    "jps": jump_point_search,
+    "ara": anytime_astar,
+}
+
+class QueryPlanner:
+    """
+    Servicio de consultas repetidas sobre un mismo grid (4 vecinos):
+      - tablas de distancia a metas frecuentes (Dijkstra inverso, BFS con
+        costo unitario): heurística perfecta, la respuesta se obtiene
+        bajando por el campo de distancias en O(largo del camino)
+      - caché LRU de caminos (inicio, meta) con memoria acotada
+    Al modificar celdas con `set_cell` se invalida sólo lo afectado.
+    """
+    def __init__(self, grid: List[str], max_tables: int = 8, hot_threshold: int = 3,
+                 cache_bytes: int = 8 * 2**20):
+        self.cg = CompiledGrid(grid)
+        self.max_tables = max_tables
+        self.hot_threshold = hot_threshold
+        self.cache_bytes = cache_bytes
+        self.tables: "OrderedDict[Coord, array]" = OrderedDict()
+        self.paths: "OrderedDict[Tuple[Coord, Coord], Tuple[SearchResult, int]]" = OrderedDict()
+        self.goal_counts: Dict[Coord, int] = {}
+        self.used_bytes = 0
+        self.counters = {"queries": 0, "cache_hits": 0, "table_hits": 0, "searches": 0,
+                         "evictions": 0, "table_builds": 0, "table_evictions": 0,
+                         "invalidated_paths": 0, "invalidated_tables": 0}
+
+    def distance_table(self, goal: Coord) -> array:
+        # Distancia de cada celda a `goal` (-1 = inalcanzable)
+        cg = self.cg
+        dist = array('i', [-1]) * len(cg.passable)
+        t = cg.node(goal)
+        if not cg.passable[t]:
+            return dist
+        dist[t] = 0
+        frontier = deque([t])
+        P, offsets = cg.passable, cg.offsets
+        while frontier:
+            n = frontier.popleft()
+            d = dist[n] + 1
+            for off in offsets:
+                nb = n + off
+                if P[nb] and dist[nb] < 0:
+                    dist[nb] = d
+                    frontier.append(nb)
+        return dist
+
+    def precompute(self, goal: Coord) -> None:
+        self.tables[goal] = self.distance_table(goal)
+        self.tables.move_to_end(goal)
+        self.counters["table_builds"] += 1
+        while len(self.tables) > self.max_tables:
+            self.tables.popitem(last=False)
+            self.counters["table_evictions"] += 1
+
+    def _walk_table(self, dist: array, start: Coord, goal: Coord, t0: float) -> SearchResult:
+        cg = self.cg
+        n = cg.node(start)
+        if dist[n] < 0:
+            return SearchResult("A* (tabla)", [], cost=float("inf"), expanded=0,
+                                runtime_ms=(time.perf_counter() - t0) * 1000)
+        path = [start]
+        while dist[n] > 0:
+            for off in cg.offsets:
+                if dist[n + off] == dist[n] - 1:
+                    n += off
+                    break
+            path.append(cg.coord(n))
+        return SearchResult("A* (tabla)", path, cost=len(path) - 1, expanded=len(path),
+                            runtime_ms=(time.perf_counter() - t0) * 1000)
+
+    def query(self, start: Coord, goal: Coord) -> SearchResult:
+        t0 = time.perf_counter()
+        self.counters["queries"] += 1
+        key = (start, goal)
+        cached = self.paths.get(key)
+        if cached is not None:
+            self.paths.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            res = cached[0]
+            return SearchResult(res.name, list(res.path), res.cost, 0, (time.perf_counter() - t0) * 1000)
+
+        self.goal_counts[goal] = self.goal_counts.get(goal, 0) + 1
+        if goal not in self.tables and self.goal_counts[goal] >= self.hot_threshold:
+            self.precompute(goal)
+        if goal in self.tables and self.cg.is_passable(start):
+            self.tables.move_to_end(goal)
+            self.counters["table_hits"] += 1
+            res = self._walk_table(self.tables[goal], start, goal, t0)
+        else:
+            self.counters["searches"] += 1
+            res = astar(self.cg, start, goal)
+        self._remember(key, res)
+        # Copia del camino: el llamador no debe poder alterar la entrada de la caché
+        return replace(res, path=list(res.path))
+
+    def _remember(self, key: Tuple[Coord, Coord], res: SearchResult) -> None:
+        size = sys.getsizeof(res.path) + len(res.path) * sys.getsizeof((0, 0)) + 200
+        if size > self.cache_bytes:
+            return
+        self.paths[key] = (res, size)
+        self.used_bytes += size
+        while self.used_bytes > self.cache_bytes:
+            _, (_, old_size) = self.paths.popitem(last=False)
+            self.used_bytes -= old_size
+            self.counters["evictions"] += 1
+
+    def set_cell(self, p: Coord, passable: bool) -> None:
+        """
+        Cambia el estado de una celda e invalida lo afectado:
+          - bloquear: los caminos que la atraviesan y las tablas que la alcanzaban
+            (un camino que no pasa por la celda sigue siendo óptimo)
+          - liberar: toda la caché de caminos (puede haber atajos nuevos) y las
+            tablas en las que algún vecino de la celda era alcanzable
+        """
+        cg = self.cg
+        n = cg.node(p)
+        if bool(cg.passable[n]) == passable:
+            return
+        cg.set_passable(p, passable)
+        if not passable:
+            stale = [k for k, (res, _) in self.paths.items() if p in res.path]
+            affected = [g for g, dist in self.tables.items() if dist[n] >= 0]
+        else:
+            stale = list(self.paths)
+            affected = [g for g, dist in self.tables.items()
+                        if any(dist[n + off] >= 0 for off in cg.offsets)]
+        for k in stale:
+            self.used_bytes -= self.paths.pop(k)[1]
+        for g in affected:
+            del self.tables[g]
+        self.counters["invalidated_paths"] += len(stale)
+        self.counters["invalidated_tables"] += len(affected)
+
+    def stats(self) -> Dict[str, float]:
+        q = self.counters["queries"]
+        return dict(self.counters,
+                    cache_hit_rate=self.counters["cache_hits"] / q if q else 0.0,
+                    table_hit_rate=self.counters["table_hits"] / q if q else 0.0,
+                    cached_paths=len(self.paths), cache_bytes=self.used_bytes,
+                    tables=len(self.tables))
+
+class HierarchicalPlanner:
+    """
+    HPA*: búsqueda jerárquica sobre un grid de 4 vecinos.
+      - el grid se divide en clusters de `cluster_size` x `cluster_size`
+      - en cada borde entre clusters vecinos, cada tramo libre continuo aporta
+        una entrada (dos si es largo) = un par de nodos abstractos unidos por
+        una arista de costo 1
+      - dentro de cada cluster se precalcula la distancia entre sus entradas
+        (BFS restringido al cluster)
+    Una consulta conecta inicio y meta a las entradas de su cluster, busca con
+    A* en el grafo abstracto y refina cada tramo con un BFS local. El camino es
+    casi óptimo (puede desviarse en los cruces entre clusters).
+    """
+    def __init__(self, grid: Union[List[str], CompiledGrid], cluster_size: int = 16,
+                 long_entrance: int = 6, connectivity: int = 4):
+        _require_4(connectivity)
+        self.cg = grid if isinstance(grid, CompiledGrid) else CompiledGrid(grid)
+        self.k = cluster_size
+        self.long_entrance = long_entrance
+        self.rows = -(-self.cg.h // cluster_size)
+        self.cols = -(-self.cg.w // cluster_size)
+        self.transitions: Dict[Tuple[Tuple[int, int], Tuple[int, int]], List[Tuple[int, int]]] = {}
+        self.inter: Dict[int, Dict[int, int]] = {}                 # nodo -> {nodo del cluster vecino: 1}
+        self.intra: Dict[Tuple[int, int], Dict[int, Dict[int, int]]] = {}  # cluster -> {a: {b: dist}}
+        t0 = time.perf_counter()
+        for ci in range(self.rows):
+            for cj in range(self.cols):
+                if ci + 1 < self.rows:
+                    self._build_border((ci, cj), (ci + 1, cj))
+                if cj + 1 < self.cols:
+                    self._build_border((ci, cj), (ci, cj + 1))
+        for ci in range(self.rows):
+            for cj in range(self.cols):
+                self._build_intra((ci, cj))
+        self.build_ms = (time.perf_counter() - t0) * 1000
+
+    def cluster_of(self, n: int) -> Tuple[int, int]:
+        i, j = self.cg.coord(n)
+        return (i // self.k, j // self.k)
+
+    def _bounds(self, c: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        k = self.k
+        return c[0] * k, min((c[0] + 1) * k, self.cg.h), c[1] * k, min((c[1] + 1) * k, self.cg.w)
+
+    def _build_border(self, a: Tuple[int, int], b: Tuple[int, int]) -> None:
+        # Entradas del borde entre los clusters vecinos a (arriba/izquierda) y b
+        cg = self.cg
+        for x, y in self.transitions.get((a, b), []):
+            self.inter[x].pop(y, None)
+            self.inter[y].pop(x, None)
+        r0, r1, c0, c1 = self._bounds(a)
+        if b[0] != a[0]:   # borde horizontal: última fila de a contra la primera de b
+            pairs = [(cg.node((r1 - 1, j)), cg.node((r1, j))) for j in range(c0, c1)]
+        else:              # borde vertical: última columna de a contra la primera de b
+            pairs = [(cg.node((i, c1 - 1)), cg.node((i, c1))) for i in range(r0, r1)]
+        P = cg.passable
+        runs, run = [], []
+        for x, y in pairs:
+            if P[x] and P[y]:
+                run.append((x, y))
+            elif run:
+                runs.append(run)
+                run = []
+        if run:
+            runs.append(run)
+        chosen = []
+        for run in runs:
+            if len(run) >= self.long_entrance:
+                chosen += [run[0], run[-1]]
+            else:
+                chosen.append(run[len(run) // 2])
+        self.transitions[(a, b)] = chosen
+        for x, y in chosen:
+            self.inter.setdefault(x, {})[y] = 1
+            self.inter.setdefault(y, {})[x] = 1
+
+    def _cluster_nodes(self, c: Tuple[int, int]) -> List[int]:
+        ci, cj = c
+        nodes = set()
+        for key in (((ci - 1, cj), c), ((ci, cj - 1), c)):
+            nodes.update(y for _, y in self.transitions.get(key, []))
+        for key in ((c, (ci + 1, cj)), (c, (ci, cj + 1))):
+            nodes.update(x for x, _ in self.transitions.get(key, []))
+        return sorted(nodes)
+
+    def _local_bfs(self, src: int, c: Tuple[int, int], target: Optional[int] = None
+                   ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        # BFS desde `src` sin salir del cluster `c`; devuelve distancias y padres
+        cg = self.cg
+        r0, r1, c0, c1 = self._bounds(c)
+        lo_i, hi_i, lo_j, hi_j = r0 + 1, r1 + 1, c0 + 1, c1 + 1
+        S, P = cg.stride, cg.passable
+        dist, parent = {src: 0}, {src: -1}
+        frontier = deque([src])
+        while frontier:
+            n = frontier.popleft()
+            if n == target:
+                break
+            d = dist[n] + 1
+            for off in cg.offsets:
+                nb = n + off
+                if nb in dist or not P[nb]:
+                    continue
+                i, j = divmod(nb, S)
+                if lo_i <= i < hi_i and lo_j <= j < hi_j:
+                    dist[nb] = d
+                    parent[nb] = n
+                    frontier.append(nb)
+        return dist, parent
+
+    def _build_intra(self, c: Tuple[int, int]) -> None:
+        nodes = self._cluster_nodes(c)
+        edges: Dict[int, Dict[int, int]] = {}
+        for a in nodes:
+            dist, _ = self._local_bfs(a, c)
+            edges[a] = {b: dist[b] for b in nodes if b != a and b in dist}
+        self.intra[c] = edges
+
+    def set_cell(self, p: Coord, passable: bool) -> List[Tuple[int, int]]:
+        """
+        Cambia una celda y reconstruye sólo los clusters afectados: el de la
+        celda y, si está sobre un borde, el cluster vecino de ese borde.
+        Devuelve la lista de clusters reconstruidos.
+        """
+        self.cg.set_passable(p, passable)
+        i, j = p
+        c = (i // self.k, j // self.k)
+        r0, r1, c0, c1 = self._bounds(c)
+        rebuilt = {c}
+        borders = []
+        if i == r0 and c[0] > 0:
+            borders.append(((c[0] - 1, c[1]), c))
+        if i == r1 - 1 and c[0] + 1 < self.rows:
+            borders.append((c, (c[0] + 1, c[1])))
+        if j == c0 and c[1] > 0:
+            borders.append(((c[0], c[1] - 1), c))
+        if j == c1 - 1 and c[1] + 1 < self.cols:
+            borders.append((c, (c[0], c[1] + 1)))
+        for a, b in borders:
+            self._build_border(a, b)
+            rebuilt.update((a, b))
+        for cl in rebuilt:
+            self._build_intra(cl)
+        return sorted(rebuilt)
+
+    def abstract_path(self, start: Coord, goal: Coord) -> Tuple[List[int], float, int]:
+        """
+        Camino en el grafo abstracto (nodos enteros del grid compilado, desde
+        el inicio hasta la meta), su costo y la cantidad de nodos expandidos.
+        """
+        cg = self.cg
+        s, t = cg.node(start), cg.node(goal)
+        if s == t:
+            return [s], 0, 0
+        if not cg.passable[t]:
+            return [], float("inf"), 0
+        cs, ct = self.cluster_of(s), self.cluster_of(t)
+        # Inserción temporal de inicio y meta en el grafo abstracto
+        dist_s, _ = self._local_bfs(s, cs)
+        start_edges = {n: dist_s[n] for n in self._cluster_nodes(cs) if n in dist_s}
+        if cs == ct and t in dist_s:
+            start_edges[t] = dist_s[t]
+        dist_t, _ = self._local_bfs(t, ct)
+        goal_edges = {n: dist_t[n] for n in self._cluster_nodes(ct) if n in dist_t}
+        expanded = len(dist_s) + len(dist_t)
+
+        gi, gj = cg.coord(t)
+        g = {s: 0}
+        parent = {s: -1}
+        closed = set()
+        pq = [(manhattan(start, goal), 0, s)]
+        tie = 0
+        while pq:
+            _, _, n = heapq.heappop(pq)
+            if n in closed:
+                continue
+            closed.add(n)
+            expanded += 1
+            if n == t:
+                path = [n]
+                while parent[n] >= 0:
+                    n = parent[n]
+                    path.append(n)
+                path.reverse()
+                return path, g[t], expanded
+            if n == s:
+                succ = list(start_edges.items()) + list(self.inter.get(n, {}).items())
+            else:
+                succ = list(self.intra[self.cluster_of(n)].get(n, {}).items())
+                succ += self.inter.get(n, {}).items()
+                if n in goal_edges:
+                    succ.append((t, goal_edges[n]))
+            for nb, w in succ:
+                ng = g[n] + w
+                if nb not in g or ng < g[nb]:
+                    g[nb] = ng
+                    parent[nb] = n
+                    tie += 1
+                    i, j = cg.coord(nb)
+                    heapq.heappush(pq, (ng + abs(i - gi) + abs(j - gj), tie, nb))
+        return [], float("inf"), expanded
+
+    def refine_segment(self, a: int, b: int) -> List[Coord]:
+        # Camino celda a celda entre dos nodos abstractos consecutivos
+        cg = self.cg
+        if b in self.inter.get(a, {}) and self.cluster_of(a) != self.cluster_of(b):
+            return [cg.coord(a), cg.coord(b)]
+        _, parent = self._local_bfs(a, self.cluster_of(a), target=b)
+        path = []
+        n = b
+        while n >= 0:
+            path.append(cg.coord(n))
+            n = parent[n]
+        path.reverse()
+        return path
+
+    def iter_segments(self, abstract: List[int]):
+        # Refinamiento perezoso: cada tramo se calcula recién cuando se pide
+        for a, b in zip(abstract, abstract[1:]):
+            yield self.refine_segment(a, b)
+
+    def search(self, start: Coord, goal: Coord, refine: bool = True) -> SearchResult:
+        """
+        Devuelve el mismo `SearchResult` que `astar`. Con `refine=False` el
+        camino contiene sólo los nodos abstractos (el costo es el del camino
+        refinado); los tramos se pueden obtener después con `iter_segments`.
+        """
+        t0 = time.perf_counter()
+        abstract, cost, expanded = self.abstract_path(start, goal)
+        if not abstract:
+            path = []
+        elif not refine:
+            path = [self.cg.coord(n) for n in abstract]
+        else:
+            path = [start]
+            for seg in self.iter_segments(abstract):
+                path.extend(seg[1:])
+                expanded += len(seg)
+        dt = (time.perf_counter() - t0) * 1000
+        return SearchResult("HPA*", path, cost=cost, expanded=expanded, runtime_ms=dt)
+
+# Planificadores con preprocesamiento: se construyen una vez por grid
+PLANNERS = {
+    "hpa": HierarchicalPlanner,
+}
+
+class DStarLite:
+    """
+    D* Lite (Koenig & Likhachev) sobre un grid de 4 vecinos. Busca desde la
+    meta hacia el robot y conserva g/rhs entre replanificaciones: cuando
+    cambian celdas sólo se reexpanden los nodos cuya distancia a la meta se
+    vio afectada.
+      - `plan()` calcula (o repara) el camino desde la posición actual
+      - `move_to(p)` avanza el robot (ajusta km, sin recalcular)
+      - `update_cells(changes)` aplica [(celda, transitable), ...] y replanifica
+    """
+    def __init__(self, grid: Union[List[str], CompiledGrid], start: Coord, goal: Coord):
+        self.cg = CompiledGrid(grid) if not isinstance(grid, CompiledGrid) else grid
+        self.start = self.cg.node(start)
+        self.goal = self.cg.node(goal)
+        self.last = self.start
+        self.km = 0
+        self.g: Dict[int, float] = {}
+        self.rhs: Dict[int, float] = {self.goal: 0}
+        self.open: List[Tuple[Tuple[float, float], int, int]] = []
+        self.open_key: Dict[int, Tuple[float, float]] = {}
+        self.tie = 0
+        self.total_expanded = 0
+        self._push(self.goal)
+
+    def _h(self, n: int) -> int:
+        a, b = divmod(n, self.cg.stride), divmod(self.start, self.cg.stride)
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def _key(self, n: int) -> Tuple[float, float]:
+        m = min(self.g.get(n, INF), self.rhs.get(n, INF))
+        return (m + self._h(n) + self.km, m)
+
+    def _push(self, n: int) -> None:
+        k = self._key(n)
+        self.open_key[n] = k
+        self.tie += 1
+        heapq.heappush(self.open, (k, self.tie, n))
+
+    def _cost(self, a: int, b: int) -> float:
+        P = self.cg.passable
+        return 1 if P[a] and P[b] else INF
+
+    def _update_vertex(self, n: int) -> None:
+        if n != self.goal:
+            best = INF
+            if self.cg.passable[n]:
+                g = self.g
+                for off in self.cg.offsets:
+                    nb = n + off
+                    c = self._cost(n, nb) + g.get(nb, INF)
+                    if c < best:
+                        best = c
+            self.rhs[n] = best
+        self.open_key.pop(n, None)  # borrado perezoso: la entrada vieja queda en el heap
+        if self.g.get(n, INF) != self.rhs.get(n, INF):
+            self._push(n)
+
+    def _top_key(self) -> Tuple[float, float]:
+        while self.open:
+            k, _, n = self.open[0]
+            if self.open_key.get(n) == k:
+                return k
+            heapq.heappop(self.open)
+        return (INF, INF)
+
+    def _compute_shortest_path(self) -> int:
+        expanded = 0
+        s = self.start
+        g, rhs = self.g, self.rhs
+        while self._top_key() < self._key(s) or rhs.get(s, INF) != g.get(s, INF):
+            k_old, _, u = heapq.heappop(self.open)
+            del self.open_key[u]
+            expanded += 1
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)
+            elif g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for off in self.cg.offsets:
+                    self._update_vertex(u + off)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for off in self.cg.offsets:
+                    self._update_vertex(u + off)
+            if not self.open:
+                break
+        self.total_expanded += expanded
+        return expanded
+
+    def _extract_path(self) -> List[Coord]:
+        # Descenso por g desde el robot hasta la meta
+        n = self.start
+        if self.g.get(n, INF) == INF:
+            return []
+        path = [self.cg.coord(n)]
+        limit = len(self.cg.passable)
+        while n != self.goal and len(path) <= limit:
+            n = min((n + off for off in self.cg.offsets),
+                    key=lambda nb: self._cost(n, nb) + self.g.get(nb, INF))
+            path.append(self.cg.coord(n))
+        return path
+
+    def plan(self) -> SearchResult:
+        t0 = time.perf_counter()
+        expanded = self._compute_shortest_path()
+        path = self._extract_path()
+        cost = len(path) - 1 if path else INF
+        dt = (time.perf_counter() - t0) * 1000
+        return SearchResult("D* Lite", path, cost=cost, expanded=expanded, runtime_ms=dt)
+
+    def move_to(self, p: Coord) -> None:
+        n = self.cg.node(p)
+        self.start = n
+        self.km += self._h(self.last)  # h(última posición, nueva posición)
+        self.last = n
+
+    def update_cells(self, changes: List[Tuple[Coord, bool]]) -> SearchResult:
+        t0 = time.perf_counter()
+        for p, passable in changes:
+            n = self.cg.node(p)
+            if bool(self.cg.passable[n]) == passable:
+                continue
+            self.cg.set_passable(p, passable)
+            # Cambian las aristas hacia y desde la celda: se revisan ella y sus vecinos
+            self._update_vertex(n)
+            for off in self.cg.offsets:
+                self._update_vertex(n + off)
+        res = self.plan()
+        res.runtime_ms = (time.perf_counter() - t0) * 1000
+        return res
+
+def replan_benchmark(grid: List[str], start: Coord, goal: Coord, steps: int = 20,
+                     advance: int = 3, seed: int = 0) -> List[Dict[str, object]]:
+    """
+    Simula un robot que avanza `advance` celdas por el camino planificado y
+    descubre una celda bloqueada más adelante en el camino. Por cada
+    replanificación compara D* Lite (reparación incremental) contra A* desde
+    cero sobre el mismo grid.
+    """
+    rng = random.Random(seed)
+    planner = DStarLite(grid, start, goal)
+    baseline = CompiledGrid(grid)
+    res = planner.plan()
+    rows = [{"step": 0, "blocked": None, "dstar_expanded": res.expanded, "dstar_ms": res.runtime_ms,
+             "astar_expanded": None, "astar_ms": None, "cost": res.cost}]
+    for step in range(1, steps + 1):
+        if len(res.path) <= advance + 2:
+            break
+        here = res.path[advance]
+        planner.move_to(here)
+        ahead = res.path[advance + 1:-1]
+        blocked = ahead[rng.randrange(len(ahead))]
+        res = planner.update_cells([(blocked, False)])
+        baseline.set_passable(blocked, False)
+        ref = astar(baseline, here, goal)
+        if res.cost != ref.cost:
+            raise RuntimeError(f"D* Lite difiere de A*: {res.cost} != {ref.cost}")
+        rows.append({"step": step, "blocked": blocked, "dstar_expanded": res.expanded,
+                     "dstar_ms": res.runtime_ms, "astar_expanded": ref.expanded,
+                     "astar_ms": ref.runtime_ms, "cost": res.cost})
+        if not res.path:
+            break
+    return rows
 
 def render(grid: List[str], path: List[Coord], start: Coord, goal: Coord) -> List[str]:
     g = [list(r) for r in grid]
@@ -113,6 +1310,17 @@ def render(grid: List[str], path: List[Coord], start: Coord, goal: Coord) -> Lis
     g[gi][gj] = 'G'
     return [''.join(r) for r in g]
 
+_ORDER_CHARS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+def render_expansions(grid: List[str], order: List[Coord]) -> List[str]:
+    # Orden de expansión (capturado con SearchProbe.on_expand): el recorrido se
+    # reparte en 36 tramos y cada celda muestra el carácter de su tramo (0-9, a-z)
+    g = [list(r) for r in grid]
+    block = max(1, -(-len(order) // len(_ORDER_CHARS)))
+    for k, (i, j) in enumerate(order):
+        g[i][j] = _ORDER_CHARS[k // block]
+    return [''.join(r) for r in g]
+
 def run_demo(kind: str) -> Tuple[List[str], Coord, Coord]:
     """
     Dos escenarios:
@@ -142,7 +1350,386 @@ def run_demo(kind: str) -> Tuple[List[str], Coord, Coord]:
         start, goal = (5,0), (4,9)
         return grid, start, goal
 
-def compare_and_print(greedy_res: SearchResult, a_res: SearchResult, grid: List[str], start: Coord, goal: Coord, show_map: bool):
+# ---------------------------------------------------------------------------
+# Mapas grandes: formato MovingAI (.map / .scen), caché binaria y generadores
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Query:
+    start: Coord
+    goal: Coord
+    optimal: Optional[float] = None  # largo óptimo declarado en el .scen (8 vecinos)
+    bucket: int = 0
+
+# Terrenos transitables del formato MovingAI; el resto ('@', 'O', 'T', 'W') es obstáculo
+MOVINGAI_PASSABLE = ".GS"
+_MOVINGAI_TABLE = bytes.maketrans(b"".join(bytes([c]) for c in range(256)),
+                                  bytes(ord('.') if chr(c) in MOVINGAI_PASSABLE else ord('#')
+                                        for c in range(256)))
+GRID_CACHE_MAGIC = b"GRIDC001"
+
+def parse_movingai_map(text: str) -> List[str]:
+    lines = text.splitlines()
+    header: Dict[str, str] = {}
+    k = 0
+    while k < len(lines) and lines[k].strip().lower() != "map":
+        parts = lines[k].split()
+        if len(parts) == 2:
+            header[parts[0].lower()] = parts[1]
+        k += 1
+    if k == len(lines):
+        raise ValueError("Archivo .map sin sección 'map'")
+    h, w = int(header["height"]), int(header["width"])
+    rows = [r.rstrip("\r\n").encode("latin-1").translate(_MOVINGAI_TABLE).decode("latin-1")
+            for r in lines[k + 1:k + 1 + h]]
+    if len(rows) != h or any(len(r) != w for r in rows):
+        raise ValueError(f"Dimensiones inconsistentes: se esperaba {h}x{w}")
+    return rows
+
+def load_map(path: str, use_cache: bool = True) -> List[str]:
+    """
+    Carga un mapa MovingAI (.map) como List[str] ('.' libre, '#' obstáculo).
+    Con `use_cache` guarda al lado una caché binaria (<mapa>.gridcache,
+    comprimida con zlib) que se reutiliza mientras el .map no cambie.
+    """
+    st = os.stat(path)
+    cache_path = path + ".gridcache"
+    if use_cache and os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            head = f.read(len(GRID_CACHE_MAGIC) + 24)
+            if head[:len(GRID_CACHE_MAGIC)] == GRID_CACHE_MAGIC:
+                h, w, mtime_ns, size = struct.unpack("<IIqq", head[len(GRID_CACHE_MAGIC):])
+                if mtime_ns == st.st_mtime_ns and size == st.st_size:
+                    cells = zlib.decompress(f.read()).decode("latin-1")
+                    return [cells[i * w:(i + 1) * w] for i in range(h)]
+    with open(path, encoding="latin-1") as f:
+        grid = parse_movingai_map(f.read())
+    if use_cache:
+        save_grid_cache(grid, cache_path, st.st_mtime_ns, st.st_size)
+    return grid
+
+def save_grid_cache(grid: List[str], cache_path: str, mtime_ns: int = 0, size: int = 0) -> None:
+    h, w = len(grid), len(grid[0]) if grid else 0
+    tmp = cache_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(GRID_CACHE_MAGIC)
+        f.write(struct.pack("<IIqq", h, w, mtime_ns, size))
+        f.write(zlib.compress("".join(grid).encode("latin-1"), 6))
+    os.replace(tmp, cache_path)
+
+def save_movingai_map(grid: List[str], path: str) -> None:
+    with open(path, "w", encoding="latin-1") as f:
+        f.write(f"type octile\nheight {len(grid)}\nwidth {len(grid[0])}\nmap\n")
+        f.write("\n".join(r.replace('#', '@') for r in grid))
+        f.write("\n")
+
+def load_scenarios(path: str) -> List[Query]:
+    """
+    Lee un archivo .scen de MovingAI. Cada línea:
+    bucket  mapa  ancho  alto  x_ini  y_ini  x_meta  y_meta  largo_óptimo
+    (x = columna, y = fila; aquí las coordenadas son (fila, columna)).
+    """
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 9 or parts[0].lower() == "version":
+                continue
+            bucket = int(parts[0])
+            sx, sy, gx, gy = (int(v) for v in parts[4:8])
+            queries.append(Query((sy, sx), (gy, gx), float(parts[8]), bucket))
+    return queries
+
+def save_scenarios(queries: List[Query], path: str, map_name: str, grid: List[str]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("version 1\n")
+        for q in queries:
+            opt = q.optimal if q.optimal is not None else 0.0
+            f.write(f"{q.bucket}\t{map_name}\t{len(grid[0])}\t{len(grid)}\t"
+                    f"{q.start[1]}\t{q.start[0]}\t{q.goal[1]}\t{q.goal[0]}\t{opt:.8f}\n")
+
+def generate_random_map(h: int, w: int, density: float = 0.25, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join('#' if rng.random() < density else '.' for _ in range(w)) for _ in range(h)]
+
+def generate_maze_map(h: int, w: int, seed: int = 0) -> List[str]:
+    # Backtracker iterativo sobre las celdas impares; pasillos de ancho 1
+    rng = random.Random(seed)
+    cells = [['#'] * w for _ in range(h)]
+    stack = [(1 % h, 1 % w)]
+    cells[stack[0][0]][stack[0][1]] = '.'
+    while stack:
+        i, j = stack[-1]
+        options = [(i + di, j + dj, di // 2, dj // 2)
+                   for di, dj in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                   if 0 < i + di < h - 1 and 0 < j + dj < w - 1 and cells[i + di][j + dj] == '#']
+        if not options:
+            stack.pop()
+            continue
+        ni, nj, hi, hj = rng.choice(options)
+        cells[i + hi][j + hj] = '.'
+        cells[ni][nj] = '.'
+        stack.append((ni, nj))
+    return ["".join(r) for r in cells]
+
+def generate_room_map(h: int, w: int, room: int = 8, door: int = 2, seed: int = 0) -> List[str]:
+    # Habitaciones de `room` x `room` separadas por paredes con una puerta
+    # de ancho `door` en cada pared (posición aleatoria)
+    rng = random.Random(seed)
+    cells = [['.'] * w for _ in range(h)]
+    for i in range(room, h, room + 1):
+        cells[i] = ['#'] * w
+    for j in range(room, w, room + 1):
+        for i in range(h):
+            cells[i][j] = '#'
+    for i0 in range(0, h, room + 1):
+        for j0 in range(0, w, room + 1):
+            if i0 + room < h:  # puerta en la pared inferior
+                j = j0 + rng.randrange(max(1, min(room, w - j0) - door + 1))
+                for d in range(door):
+                    if j + d < w:
+                        cells[i0 + room][j + d] = '.'
+            if j0 + room < w:  # puerta en la pared derecha
+                i = i0 + rng.randrange(max(1, min(room, h - i0) - door + 1))
+                for d in range(door):
+                    if i + d < h:
+                        cells[i + d][j0 + room] = '.'
+    return ["".join(r) for r in cells]
+
+MAP_GENERATORS = {
+    "random": lambda h, w, seed: generate_random_map(h, w, 0.25, seed),
+    "maze": generate_maze_map,
+    "rooms": lambda h, w, seed: generate_room_map(h, w, seed=seed),
+}
+
+def random_queries(grid: List[str], count: int, seed: int = 0) -> List[Query]:
+    # Pares (inicio, meta) de celdas libres elegidos al azar
+    rng = random.Random(seed)
+    free = [(i, j) for i, row in enumerate(grid) for j, c in enumerate(row) if c != '#']
+    if not free:
+        return []
+    return [Query(rng.choice(free), rng.choice(free)) for _ in range(count)]
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+INSTRUMENTED = ("greedy", "astar")
+
+def run_benchmark(grid: List[str], queries: List[Query], algorithms: List[str],
+                  connectivity: int = 4, memory_sample: int = 20,
+                  instrument: bool = False) -> List[Dict[str, object]]:
+    """
+    Corre cada algoritmo sobre todas las consultas y reporta por algoritmo:
+    expansiones, percentiles de tiempo, brecha de optimalidad respecto de A*
+    (costo / óptimo - 1) y memoria pico (tracemalloc, medida aparte sobre las
+    primeras `memory_sample` consultas para no distorsionar los tiempos).
+    Con `instrument`, Greedy y A* corren con SearchProbe(timers=True) y el
+    reporte agrega sus contadores (promedio por consulta) y tiempos por fase
+    (totales).
+    """
+    search_grid: Union[List[str], CompiledGrid] = CompiledGrid(grid) if connectivity == 4 else grid
+    optimal = [astar(search_grid, q.start, q.goal, connectivity).cost for q in queries]
+    report = []
+    for name in algorithms:
+        build_ms = 0.0
+        if name in PLANNERS:
+            planner = PLANNERS[name](search_grid, connectivity=connectivity)
+            build_ms = planner.build_ms
+            fn = lambda _grid, s, t, _conn, planner=planner: planner.search(s, t)
+        else:
+            fn = ALGORITHMS[name]
+        runtimes, expanded, gaps = [], [], []
+        probed: List[SearchStats] = []
+        probe = SearchProbe(timers=True) if instrument and name in INSTRUMENTED else None
+        solved = 0
+        for q, opt in zip(queries, optimal):
+            res = fn(search_grid, q.start, q.goal, connectivity)
+            runtimes.append(res.runtime_ms)
+            expanded.append(res.expanded)
+            if res.path:
+                solved += 1
+                if opt not in (0, float("inf")):
+                    gaps.append(res.cost / opt - 1)
+        if probe is not None:
+            # Pasada aparte: los cronómetros por fase no alteran los percentiles
+            probed = [fn(search_grid, q.start, q.goal, connectivity, probe).stats for q in queries]
+        peak = 0
+        for q in queries[:memory_sample]:
+            tracemalloc.start()
+            fn(search_grid, q.start, q.goal, connectivity)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        report.append({
+            "algorithm": name,
+            "queries": len(queries),
+            "solved": solved,
+            "expanded_mean": statistics.fmean(expanded) if expanded else 0.0,
+            "runtime_p50_ms": percentile(runtimes, 0.50),
+            "runtime_p90_ms": percentile(runtimes, 0.90),
+            "runtime_p99_ms": percentile(runtimes, 0.99),
+            "gap_mean": statistics.fmean(gaps) if gaps else 0.0,
+            "gap_max": max(gaps) if gaps else 0.0,
+            "peak_mem_kb": peak / 1024,
+            "build_ms": build_ms,
+        })
+        if probed:
+            report[-1]["instrumentation"] = aggregate_stats(probed)
+    return report
+
+def aggregate_stats(stats: List[SearchStats]) -> Dict[str, float]:
+    n = len(stats)
+    agg: Dict[str, float] = {f"{k}_mean": sum(getattr(st, k) for st in stats) / n
+                             for k in ("pushes", "pops", "stale_pops", "reopened", "peak_open")}
+    for k in ("pop_ms", "push_ms", "neighbors_ms", "other_ms"):
+        values = [getattr(st, k) for st in stats if getattr(st, k) is not None]
+        agg[f"{k}_total"] = sum(values) if values else None
+    return agg
+
+def print_instrumentation(report: List[Dict[str, object]]) -> None:
+    rows = [r for r in report if "instrumentation" in r]
+    if not rows:
+        return
+    print(f"\n{'algoritmo':12s} {'empujes':>9s} {'extracc.':>9s} {'duplic.':>9s} {'reaperturas':>11s} "
+          f"{'pico abierta':>12s} {'pop ms':>9s} {'push ms':>9s} {'vecinos ms':>10s} {'resto ms':>9s}")
+    fmt = lambda v, w: f"{v:{w}.1f}" if v is not None else f"{'-':>{w}s}"
+    for r in rows:
+        a = r["instrumentation"]
+        print(f"{r['algorithm']:12s} {a['pushes_mean']:9.1f} {a['pops_mean']:9.1f} {a['stale_pops_mean']:9.1f} "
+              f"{a['reopened_mean']:11.2f} {a['peak_open_mean']:12.1f} {fmt(a['pop_ms_total'], 9)} "
+              f"{fmt(a['push_ms_total'], 9)} {fmt(a['neighbors_ms_total'], 10)} {fmt(a['other_ms_total'], 9)}")
+
+def print_benchmark(report: List[Dict[str, object]]) -> None:
+    print(f"{'algoritmo':12s} {'consultas':>9s} {'resueltas':>9s} {'expand.':>10s} "
+          f"{'p50 ms':>9s} {'p90 ms':>9s} {'p99 ms':>9s} {'brecha':>8s} {'brecha máx':>10s} {'mem KB':>9s} {'prep ms':>9s}")
+    for r in report:
+        print(f"{r['algorithm']:12s} {r['queries']:9d} {r['solved']:9d} {r['expanded_mean']:10.1f} "
+              f"{r['runtime_p50_ms']:9.3f} {r['runtime_p90_ms']:9.3f} {r['runtime_p99_ms']:9.3f} "
+              f"{r['gap_mean']:8.4f} {r['gap_max']:10.4f} {r['peak_mem_kb']:9.1f} {r['build_ms']:9.1f}")
+
+# ---------------------------------------------------------------------------
+# Consultas en lote: grid en memoria compartida + pool de procesos
+# ---------------------------------------------------------------------------
+
+_BATCH: Dict[str, object] = {}
+
+def _batch_init(shm_name: str, h: int, w: int, algorithm: str, connectivity: int, with_paths: bool):
+    # Cada worker se engancha una sola vez a la máscara compartida
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _BATCH.update(shm=shm, cg=CompiledGrid.from_mask(h, w, shm.buf[:(h + 2) * (w + 2)]),
+                  fn=ALGORITHMS[algorithm], connectivity=connectivity, with_paths=with_paths)
+
+def _batch_chunk(chunk: List[Tuple[int, Coord, Coord]]) -> List[Dict[str, object]]:
+    cg, fn, conn = _BATCH["cg"], _BATCH["fn"], _BATCH["connectivity"]
+    return [batch_record(qid, start, goal, fn(cg, start, goal, conn), _BATCH["with_paths"])
+            for qid, start, goal in chunk]
+
+def batch_record(qid: int, start: Coord, goal: Coord, res: SearchResult, with_paths: bool) -> Dict[str, object]:
+    rec = {"id": qid, "start": list(start), "goal": list(goal), "algorithm": res.name,
+           "cost": res.cost if res.path else None, "expanded": res.expanded,
+           "runtime_ms": round(res.runtime_ms, 4)}
+    if with_paths:
+        rec["path"] = [list(p) for p in res.path]
+    return rec
+
+def batch_search(grid: List[str], queries, algorithm: str = "astar", connectivity: int = 4,
+                 workers: Optional[int] = None, chunk_size: int = 64, with_paths: bool = True):
+    """
+    Resuelve un lote de consultas (iterable de (inicio, meta)) en paralelo.
+    La máscara del grid se copia una vez a memoria compartida y cada worker la
+    usa sin copiarla; a las tareas sólo viajan trozos de `chunk_size`
+    consultas. Genera un dict por consulta (con su "id" = posición en el lote)
+    en orden de finalización. Con `workers=1` corre en el proceso actual.
+    Una celda fuera del grid corta el lote con ValueError (indica el "id").
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Algoritmo desconocido: {algorithm} (opciones: {', '.join(ALGORITHMS)})")
+    if connectivity == 8 and algorithm != "jps":
+        raise ValueError("En el grid compilado sólo 'jps' admite conectividad 8")
+    shape = (len(grid), len(grid[0]) if grid else 0)
+
+    def indexed_queries():
+        for qid, q in enumerate(queries):
+            try:
+                yield qid, _check_cell(tuple(q[0]), shape), _check_cell(tuple(q[1]), shape)
+            except ValueError as e:
+                raise ValueError(f"consulta {qid}: consulta inválida: {e}") from e
+
+    indexed = indexed_queries()
+    cg = CompiledGrid(grid)
+    if workers == 1:
+        fn = ALGORITHMS[algorithm]
+        for qid, start, goal in indexed:
+            yield batch_record(qid, start, goal, fn(cg, start, goal, connectivity), with_paths)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    shm = shared_memory.SharedMemory(create=True, size=len(cg.passable))
+    try:
+        shm.buf[:len(cg.passable)] = cg.passable
+        with ProcessPoolExecutor(max_workers=workers, initializer=_batch_init,
+                                 initargs=(shm.name, cg.h, cg.w, algorithm, connectivity, with_paths)) as pool:
+            # Ventana acotada de trozos en vuelo: la entrada puede ser un stream
+            pending = set()
+            while True:
+                while len(pending) < 4 * workers:
+                    chunk = list(islice(indexed, chunk_size))
+                    if not chunk:
+                        break
+                    pending.add(pool.submit(_batch_chunk, chunk))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+def _parse_cell(value, shape: Optional[Tuple[int, int]] = None) -> Coord:
+    if not isinstance(value, list) or len(value) != 2 or not all(type(v) is int for v in value):
+        raise ValueError(f"se esperaba [fila, columna] enteros, no {value!r}")
+    return _check_cell((value[0], value[1]), shape)
+
+def _check_cell(p: Coord, shape: Optional[Tuple[int, int]]) -> Coord:
+    # CompiledGrid.node no valida: fuera de rango caería en otra fila o en el borde
+    if shape is not None and not (0 <= p[0] < shape[0] and 0 <= p[1] < shape[1]):
+        raise ValueError(f"celda {list(p)} fuera del grid de {shape[0]}x{shape[1]}")
+    return p
+
+def read_batch_queries(path: str, shape: Optional[Tuple[int, int]] = None):
+    # JSON lines {"start": [f, c], "goal": [f, c]} (o "-" para stdin), o un .scen de MovingAI.
+    # Con `shape` = (alto, ancho) también se rechazan las celdas fuera del grid
+    if path.endswith(".scen"):
+        for lineno, q in enumerate(load_scenarios(path), 1):
+            try:
+                yield _check_cell(q.start, shape), _check_cell(q.goal, shape)
+            except ValueError as e:
+                raise ValueError(f"{path}: escenario {lineno}: consulta inválida: {e}") from e
+        return
+    # Una línea mal formada se informa con su número de línea
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+                start, goal = _parse_cell(obj["start"], shape), _parse_cell(obj["goal"], shape)
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{lineno}: consulta inválida: {e}") from e
+            yield start, goal
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def compare_and_print(greedy_res: SearchResult, a_res: SearchResult, grid: List[str], start: Coord, goal: Coord, show_map: bool,
+                      jps_res: Optional[SearchResult] = None):
     def show(title: str, res: SearchResult):
         print(f"\n== {title} ==")
         print(f"  Encontrado: {bool(res.path)}")
@@ -150,11 +1737,22 @@ def compare_and_print(greedy_res: SearchResult, a_res: SearchResult, grid: List[
         print(f"  Longitud   : {len(res.path)}")
         print(f"  Expandidos : {res.expanded}")
         print(f"  Tiempo     : {res.runtime_ms:.3f} ms")
+        if res.stats is not None:
+            st = res.stats
+            print(f"  Cola       : {st.pushes} empujes, {st.stale_pops} duplicados, "
+                  f"{st.reopened} reaperturas, pico {st.peak_open}")
+            if st.pop_ms is not None:
+                nb = f"{st.neighbors_ms:.3f}" if st.neighbors_ms is not None else "-"
+                print(f"  Fases (ms) : pop {st.pop_ms:.3f}  push {st.push_ms:.3f}  vecinos {nb}  resto {st.other_ms:.3f}")
+            if st.peak_mem_kb is not None:
+                print(f"  Memoria    : {st.peak_mem_kb:.1f} KB pico")
         if show_map and res.path:
             print("\n".join(render(grid, res.path, start, goal)))
 
     show(greedy_res.name, greedy_res)
     show(a_res.name, a_res)
+    if jps_res is not None:
+        show(jps_res.name, jps_res)
 
     # Comparación
     if greedy_res.path and a_res.path:
@@ -163,33 +1761,214 @@ def compare_and_print(greedy_res: SearchResult, a_res: SearchResult, grid: List[
         print(f"  Método con menor costo: {better}")
         print(f"  ΔCosto = {greedy_res.cost - a_res.cost}")
         print(f"  ΔExpandidos = {greedy_res.expanded - a_res.expanded}")
+        if jps_res is not None and jps_res.path:
+            print(f"  JPS vs A*: ΔCosto = {jps_res.cost - a_res.cost}  ΔExpandidos = {jps_res.expanded - a_res.expanded}")
     else:
         print("\n--- Comparación ---")
         print("  Al menos uno de los métodos no encontró solución.")
 
+# Mapa de regresión: la meta (0, 7) queda aislada y ARA* con eps > 1 termina
+# con nodos inconsistentes sin haberla alcanzado
+_ISOLATED_GOAL_MAP = [
+    "#....##.",
+    ".#.....#",
+    ".....#..",
+    ".#......",
+    ".....###",
+    "........",
+    ".......#",
+    ".....#..",
+]
+
+def regression_checks() -> List[str]:
+    # Casos que alguna vez fallaron; devuelve la descripción de los que fallan
+    failures = []
+    for eps0 in (1.0, 2.0, 3.0):
+        res = anytime_astar(_ISOLATED_GOAL_MAP, (5, 7), (0, 7), eps0=eps0)
+        if not isinstance(res, SearchResult) or res.path or res.cost != INF:
+            failures.append(f"ARA* (eps0={eps0}) con meta inalcanzable devolvió {res!r}")
+    # Consultas en lote con celdas negativas o más allá del borde
+    grid = ["." * 20] * 20
+    for start, goal in (((0, 22), (3, 0)), ((-1, 5), (3, 0)), ((3, 0), (20, 4)), ((3, 0), (4, -3))):
+        try:
+            list(batch_search(grid, [(start, goal)], workers=1))
+            failures.append(f"batch_search aceptó la consulta fuera del grid {start} -> {goal}")
+        except ValueError:
+            pass
+        try:
+            _parse_cell(list(start), (20, 20)), _parse_cell(list(goal), (20, 20))
+            failures.append(f"read_batch_queries aceptó la consulta fuera del grid {start} -> {goal}")
+        except ValueError:
+            pass
+    # Alterar el camino devuelto no debe corromper la caché de QueryPlanner
+    planner = QueryPlanner(grid)
+    planner.query((0, 0), (5, 5)).path.clear()
+    if len(planner.query((0, 0), (5, 5)).path) != 11:
+        failures.append("QueryPlanner devolvió el camino guardado en su caché")
+    return failures
+
 def main():
-    parser = argparse.ArgumentParser(description="Greedy Best-First vs A* en un grid 2D (4-neigh).")
+    parser = argparse.ArgumentParser(description="Greedy Best-First vs A* vs JPS en un grid 2D.")
     parser.add_argument("--scenario", choices=["corridor","maze"], default="corridor", help="Escenario de prueba")
     parser.add_argument("--show-map", action="store_true", help="Imprime el grid con el camino")
-    parser.add_argument("--json", action="store_true", help="Salida en JSON con ambas métricas")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON con las métricas de cada método")
+    parser.add_argument("--compiled", action="store_true", help="Busca sobre el grid compilado (arreglos planos)")
+    parser.add_argument("--connectivity", type=int, choices=[4, 8], default=4,
+                        help="Vecindad: 4 (default) u 8 (diagonales de costo √2, sin cortar esquinas)")
+    parser.add_argument("--instrument", action="store_true",
+                        help="Instrumenta Greedy y A* (contadores de la cola, tiempos por fase, memoria y orden "
+                             "de expansión); también agrega el reporte en --benchmark")
+    parser.add_argument("--check", action="store_true", help="Corre los chequeos de regresión y termina")
+    bench = parser.add_argument_group("benchmark sobre mapas grandes")
+    bench.add_argument("--benchmark", action="store_true", help="Corre el benchmark de escenarios")
+    bench.add_argument("--map", help="Mapa MovingAI (.map); se cachea en <mapa>.gridcache")
+    bench.add_argument("--scen", help="Escenarios MovingAI (.scen) para --map")
+    bench.add_argument("--generate", choices=list(MAP_GENERATORS), default="random",
+                       help="Generador de mapa si no se da --map (default: random)")
+    bench.add_argument("--size", type=int, nargs=2, metavar=("ALTO", "ANCHO"), default=[256, 256],
+                       help="Tamaño del mapa generado (default: 256 256)")
+    bench.add_argument("--queries", type=int, default=1000, help="Consultas aleatorias si no hay --scen")
+    bench.add_argument("--seed", type=int, default=0, help="Semilla del mapa y las consultas")
+    bench.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS) + list(PLANNERS),
+                       default=["greedy", "astar", "jps"],
+                       help="Algoritmos a comparar; 'hpa' (HPA*) y 'ara' (ARA*) sólo admiten 4 vecinos "
+                            "y 'hpa' preprocesa el mapa una vez")
+    replan = parser.add_argument_group("replanificación incremental")
+    replan.add_argument("--replan", type=int, metavar="PASOS",
+                        help="Simula PASOS descubrimientos de obstáculos y compara D* Lite con A* desde cero "
+                             "(usa --generate, --size y --seed)")
+    anytime = parser.add_argument_group("búsqueda anytime (ARA*)")
+    anytime.add_argument("--anytime", action="store_true",
+                         help="Muestra las soluciones sucesivas de ARA* sobre el escenario (4 vecinos)")
+    anytime.add_argument("--eps", type=float, default=3.0, help="Peso inicial de la heurística (default: 3.0)")
+    anytime.add_argument("--deadline-ms", type=float, default=None, help="Presupuesto de tiempo por consulta")
+    anytime.add_argument("--max-expanded", type=int, default=None, help="Presupuesto de nodos expandidos")
+    batch = parser.add_argument_group("consultas en lote")
+    batch.add_argument("--batch", nargs="?", const="", metavar="ARCHIVO",
+                       help="Resuelve un lote y emite JSON lines en orden de finalización. ARCHIVO: JSON lines "
+                            "con start/goal, un .scen o '-' (stdin); sin ARCHIVO usa --queries consultas aleatorias")
+    batch.add_argument("--algorithm", choices=list(ALGORITHMS), default="astar", help="Algoritmo del lote")
+    batch.add_argument("--workers", type=int, default=None, help="Procesos del pool (default: todos los núcleos)")
+    batch.add_argument("--chunk-size", type=int, default=64, help="Consultas por tarea (default: 64)")
+    batch.add_argument("--no-paths", action="store_true", help="No incluye los caminos en la salida")
     args = parser.parse_args()
 
+    if args.check:
+        failures = regression_checks()
+        for msg in failures:
+            print(f"FALLA: {msg}", file=sys.stderr)
+        print("chequeos de regresión: " + ("FALLA" if failures else "OK"), file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+    if args.batch is not None:
+        grid = load_map(args.map) if args.map else MAP_GENERATORS[args.generate](args.size[0], args.size[1], args.seed)
+        if args.connectivity == 8 and args.algorithm != "jps":
+            parser.error("--batch con --connectivity 8 sólo admite --algorithm jps")
+
+        def parsed(path: str):
+            # Sólo los errores de lectura de la entrada se reportan como error de uso
+            try:
+                yield from read_batch_queries(path, (len(grid), len(grid[0])))
+            except ValueError as e:
+                parser.error(str(e))
+
+        if args.batch:
+            queries = parsed(args.batch)
+        else:
+            queries = ((q.start, q.goal) for q in random_queries(grid, args.queries, args.seed))
+        t0 = time.perf_counter()
+        count = 0
+        for rec in batch_search(grid, queries, args.algorithm, args.connectivity,
+                                args.workers, args.chunk_size, not args.no_paths):
+            print(json.dumps(rec))
+            count += 1
+        dt = time.perf_counter() - t0
+        print(f"{count} consultas en {dt:.2f} s ({count / dt if dt else 0:.1f} consultas/s)", file=sys.stderr)
+        return
+
+    if args.replan:
+        grid = MAP_GENERATORS[args.generate](args.size[0], args.size[1], args.seed)
+        q = next(q for q in random_queries(grid, 1000, args.seed) if manhattan(q.start, q.goal) > len(grid) // 2
+                 and astar(CompiledGrid(grid), q.start, q.goal).path)
+        rows = replan_benchmark(grid, q.start, q.goal, args.replan, seed=args.seed)
+        if args.json:
+            print(json.dumps(rows, ensure_ascii=False, indent=2))
+            return
+        print(f"Mapa: {args.generate} ({len(grid)}x{len(grid[0])})  Inicio: {q.start}  Meta: {q.goal}")
+        print(f"{'paso':>4s} {'bloqueada':>12s} {'D* exp.':>9s} {'D* ms':>9s} {'A* exp.':>9s} {'A* ms':>9s} {'costo':>7s}")
+        for r in rows:
+            blocked = str(r["blocked"]) if r["blocked"] else "-"
+            a_exp = f"{r['astar_expanded']:9d}" if r["astar_expanded"] is not None else f"{'-':>9s}"
+            a_ms = f"{r['astar_ms']:9.3f}" if r["astar_ms"] is not None else f"{'-':>9s}"
+            print(f"{r['step']:4d} {blocked:>12s} {r['dstar_expanded']:9d} {r['dstar_ms']:9.3f} {a_exp} {a_ms} {r['cost']:>7}")
+        return
+
+    if args.benchmark:
+        if args.map:
+            grid = load_map(args.map)
+            queries = load_scenarios(args.scen) if args.scen else random_queries(grid, args.queries, args.seed)
+        else:
+            grid = MAP_GENERATORS[args.generate](args.size[0], args.size[1], args.seed)
+            queries = random_queries(grid, args.queries, args.seed)
+        report = run_benchmark(grid, queries, args.algorithms, args.connectivity, instrument=args.instrument)
+        if args.json:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            print(f"Mapa: {args.map or args.generate} ({len(grid)}x{len(grid[0])})  Consultas: {len(queries)}")
+            print_benchmark(report)
+            print_instrumentation(report)
+        return
+
     grid, start, goal = run_demo(args.scenario)
+    if args.anytime:
+        if args.connectivity != 4:
+            parser.error("--anytime sólo admite --connectivity 4")
+        sols = list(ara_star(grid, start, goal, eps0=args.eps, deadline_ms=args.deadline_ms,
+                             max_expanded=args.max_expanded))
+        if args.json:
+            print(json.dumps([asdict(r) for r in sols], ensure_ascii=False, indent=2))
+            return
+        print(f"Escenario: {args.scenario}  Inicio: {start}  Meta: {goal}")
+        print(f"{'solución':>8s} {'costo':>7s} {'cota':>7s} {'expand.':>8s} {'ms':>9s}")
+        for k, r in enumerate(sols, 1):
+            print(f"{k:8d} {r.cost:>7} {r.bound:7.3f} {r.expanded:8d} {r.runtime_ms:9.3f}")
+        if args.show_map and sols and sols[-1].path:
+            print("\n".join(render(grid, sols[-1].path, start, goal)))
+        return
+    if args.compiled and args.connectivity != 4:
+        parser.error("--compiled sólo admite --connectivity 4")
+    search_grid = CompiledGrid(grid) if args.compiled else grid
+
+    orders: Dict[str, List[Coord]] = {"greedy": [], "astar": []}
+    def probe_for(key: str) -> Optional[SearchProbe]:
+        if not args.instrument:
+            return None
+        return SearchProbe(timers=True, memory=True, on_expand=lambda p, _v, _k: orders[key].append(p))
 
-    gr = greedy_best_first(grid, start, goal)
-    ar = astar(grid, start, goal)
+    gr = greedy_best_first(search_grid, start, goal, args.connectivity, probe_for("greedy"))
+    ar = astar(search_grid, start, goal, args.connectivity, probe_for("astar"))
+    jr = jump_point_search(search_grid, start, goal, args.connectivity)
 
     if args.json:
-        print(json.dumps({
+        out = {
             "scenario": args.scenario,
             "start": start, "goal": goal,
-            "greedy": gr.__dict__,
-            "astar": ar.__dict__,
-        }, ensure_ascii=False, indent=2))
+            "connectivity": args.connectivity,
+            "greedy": asdict(gr),
+            "astar": asdict(ar),
+            "jps": asdict(jr),
+        }
+        if args.instrument:
+            out["expansion_order"] = orders
+        print(json.dumps(out, ensure_ascii=False, indent=2))
     else:
         print(f"Escenario: {args.scenario}")
         print(f"Inicio: {start}  Meta: {goal}")
-        compare_and_print(gr, ar, grid, start, goal, show_map=args.show_map)
+        compare_and_print(gr, ar, grid, start, goal, show_map=args.show_map, jps_res=jr)
+        if args.instrument and args.show_map:
+            for key, res in (("greedy", gr), ("astar", ar)):
+                print(f"\n== Orden de expansión: {res.name} ==")
+                print("\n".join(render_expansions(grid, orders[key])))
 
 if __name__ == "__main__":
     main()
@@ -6,14 +6,21 @@ import matplotlib.pyplot as plt
 from dataclasses import dataclass
 from typing import List, Tuple, Dict, Optional, Any
 import os
+import time
+import argparse
+import json
+import zlib
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 
 def to_pm1(matrix01: np.ndarray) -> np.ndarray:
     mat = matrix01.astype(np.int8)
     mat_pm1 = np.where(mat > 0, 1, -1).astype(np.int8)
     return mat_pm1.reshape(-1, 1)
 
-def to_01(vector_pm1: np.ndarray) -> np.ndarray:
-    vec = vector_pm1.reshape(10, 10)
+def to_01(vector_pm1: np.ndarray, shape: Tuple[int, ...] = (10, 10)) -> np.ndarray:
+    vec = vector_pm1.reshape(shape)
     return np.where(vec > 0, 1, 0).astype(np.int8)
 
 def hamming_distance(x: np.ndarray, y: np.ndarray) -> int:
@@ -27,26 +34,25 @@ def add_noise_pm1(x: np.ndarray, flip_ratio: float, rng: np.random.Generator) ->
     noisy[idx] *= -1
     return noisy.reshape(-1, 1)
 
-def pattern_ring(radius: float = 3.0, thickness: float = 1.0) -> np.ndarray:
-    g = np.zeros((10, 10), dtype=np.int8)
-    cx, cy = 4.5, 4.5
-    for i in range(10):
-        for j in range(10):
-            r = np.sqrt((i - cx) ** 2 + (j - cy) ** 2)
-            if abs(r - radius) <= thickness / 2.0:
-                g[i, j] = 1
+def pattern_ring(radius: float = 3.0, thickness: float = 1.0, size: int = 10) -> np.ndarray:
+    g = np.zeros((size, size), dtype=np.int8)
+    cx = cy = (size - 1) / 2.0
+    i, j = np.indices((size, size))
+    r = np.sqrt((i - cx) ** 2 + (j - cy) ** 2)
+    g[np.abs(r - radius) <= thickness / 2.0] = 1
     return g
 
-def pattern_plus() -> np.ndarray:
-    g = np.zeros((10, 10), dtype=np.int8)
-    g[:, 5] = 1
-    g[5, :] = 1
+def pattern_plus(size: int = 10) -> np.ndarray:
+    g = np.zeros((size, size), dtype=np.int8)
+    g[:, size // 2] = 1
+    g[size // 2, :] = 1
     return g
 
-def pattern_L() -> np.ndarray:
-    g = np.zeros((10, 10), dtype=np.int8)
-    g[7:, 1] = 1
-    g[9, 1:7] = 1
+def pattern_L(size: int = 10) -> np.ndarray:
+    g = np.zeros((size, size), dtype=np.int8)
+    col = size // 10
+    g[(7 * size) // 10:, col] = 1
+    g[size - 1, col:(7 * size) // 10] = 1
     return g
 
 @dataclass
@@ -58,10 +64,9 @@ class Hopfield:
     def train_hebb(patterns_pm1: List[np.ndarray]) -> "Hopfield":
         n = patterns_pm1[0].size
         W = np.zeros((n, n), dtype=np.float64)
-        I = np.eye(n, dtype=np.float64)
         for x in patterns_pm1:
-            x = x.reshape(n, 1).astype(np.float64)
-            W += x @ x.T - I
+            x = x.reshape(-1).astype(np.float64)
+            W += np.outer(x, x)
         np.fill_diagonal(W, 0.0)
         return Hopfield(n=n, W=W)
 
@@ -77,7 +82,7 @@ class Hopfield:
 
     def energy(self, x: np.ndarray) -> float:
         x = x.reshape(self.n, 1).astype(np.float64)
-        return float(-0.5 * (x.T @ self.W @ x))
+        return float(-0.5 * (x.T @ self.W @ x).item())
 
     def recall(
         self,
@@ -85,11 +90,36 @@ class Hopfield:
         max_iters: int = 50,
         asynchronous: bool = True,
         rng: Optional[np.random.Generator] = None,
-        track_energy: bool = False
+        track_energy: bool = False,
+        incremental: bool = True
     ) -> Tuple[np.ndarray, int, Optional[List[float]]]:
         x = x0.reshape(self.n, 1).astype(np.float64).copy()
         energy_list = [self.energy(x)] if track_energy else None
-        if asynchronous:
+        if asynchronous and incremental:
+            if rng is None:
+                rng = np.random.default_rng(0)
+            # Campo local h = W x: se actualiza con una columna de W sólo cuando
+            # una neurona cambia, y la energía con dE = -d*h_i - W_ii*d^2/2.
+            xv = x.reshape(-1)
+            h = self.W @ xv
+            E = float(-0.5 * (xv @ h))
+            for it in range(max_iters):
+                order = rng.permutation(self.n)
+                changed = False
+                for i in order:
+                    new_state = 1.0 if h[i] >= 0 else -1.0
+                    if new_state != xv[i]:
+                        delta = new_state - xv[i]
+                        E -= delta * h[i] + 0.5 * self.W[i, i] * delta * delta
+                        xv[i] = new_state
+                        h += delta * self.W[:, i]
+                        changed = True
+                if track_energy:
+                    energy_list.append(E)
+                if not changed:
+                    return x.astype(np.int8), it + 1, energy_list
+            return x.astype(np.int8), max_iters, energy_list
+        elif asynchronous:
             if rng is None:
                 rng = np.random.default_rng(0)
             for it in range(max_iters):
@@ -119,13 +149,712 @@ class Hopfield:
                     energy_list.append(self.energy(x))
             return x.astype(np.int8), max_iters, energy_list
 
-def visualize_triplets(triplets: List[Tuple[np.ndarray, np.ndarray, np.ndarray]], titles: List[str], out_path: str):
+    def recall_batch(
+        self,
+        X0: np.ndarray,
+        max_iters: int = 50,
+        asynchronous: bool = False,
+        seeds: Optional[List[int]] = None,
+        block_size: int = 1
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # X0: (n x B), una sonda por columna. Devuelve los estados finales
+        # (n x B, int8) y las iteraciones de cada sonda.
+        X = X0.reshape(self.n, -1).astype(np.float64).copy()
+        B = X.shape[1]
+        iters = np.full(B, max_iters, dtype=np.int64)
+        active = np.arange(B)
+        if asynchronous:
+            # Un generador por sonda: su trayectoria no depende del resto del lote.
+            # Con block_size=1 coincide con recall(x, rng=np.random.default_rng(seed)).
+            if seeds is None:
+                seeds = [0] * B
+            rngs = [np.random.default_rng(s) for s in seeds]
+            H = self.W @ X  # campos locales, actualizados por columnas al cambiar una neurona
+            for it in range(max_iters):
+                if active.size == 0:
+                    break
+                orders = np.stack([rngs[b].permutation(self.n) for b in active], axis=1)
+                Xa = X[:, active]
+                Ha = H[:, active]
+                cols = np.arange(active.size)
+                changed = np.zeros(active.size, dtype=bool)
+                for start in range(0, self.n, block_size):
+                    idx = orders[start:start + block_size]  # (bloque x activas)
+                    new_state = np.where(Ha[idx, cols] >= 0, 1.0, -1.0)
+                    delta = new_state - Xa[idx, cols]
+                    # Sólo las neuronas que cambian actualizan los campos locales
+                    for r in range(idx.shape[0]):
+                        c = np.nonzero(delta[r])[0]
+                        if c.size:
+                            Ha[:, c] += self.W[:, idx[r, c]] * delta[r, c]
+                    changed |= np.any(delta != 0, axis=0)
+                    Xa[idx, cols] = new_state
+                X[:, active] = Xa
+                H[:, active] = Ha
+                done = ~changed
+                iters[active[done]] = it + 1
+                active = active[~done]
+        else:
+            for it in range(max_iters):
+                if active.size == 0:
+                    break
+                Xa = X[:, active]
+                X_new = np.sign(self.W @ Xa)
+                X_new[X_new == 0] = 1.0
+                done = np.all(X_new == Xa, axis=0)
+                X[:, active] = X_new
+                iters[active[done]] = it + 1
+                active = active[~done]
+        return X.astype(np.int8), iters
+
+class OnlineHopfieldTrainer:
+    # Entrenador con estado: agrega y quita patrones sin reentrenar desde cero.
+    #  - Hebb: W += x x^T / W -= x x^T.
+    #  - Pseudoinversa: W = P (proyector sobre span(U)) con diagonal nula. P se
+    #    actualiza con proyecciones de rango uno (Greville) y se mantiene
+    #    G^-1 = (U^T U)^-1 por bordeado para poder quitar patrones.
+    # Costo por operación O(n^2 + nq + q^2) en lugar de O(n^2 q + q^3).
+
+    def __init__(self, n: int, rule: str = "pseudoinverse", tol: float = 1e-9):
+        if rule not in ("hebb", "pseudoinverse"):
+            raise ValueError(f"Regla desconocida: {rule!r}")
+        self.n = n
+        self.rule = rule
+        self.tol = tol
+        self.patterns: List[np.ndarray] = []
+        self.P = np.zeros((n, n), dtype=np.float64)  # Hebb: suma de x x^T
+        self.G_inv: Optional[np.ndarray] = np.zeros((0, 0), dtype=np.float64)
+
+    def add_pattern(self, x_pm1: np.ndarray) -> int:
+        x = x_pm1.reshape(-1).astype(np.float64)
+        if self.rule == "hebb":
+            self.P += np.outer(x, x)
+        else:
+            r = x - self.P @ x  # componente fuera del subespacio ya almacenado
+            s = float(r @ r)
+            if s > self.tol * float(x @ x):
+                self.P += np.outer(r, r) / s
+                if self.G_inv is not None:
+                    # Bordeado de (U^T U)^-1; el complemento de Schur es |r|^2
+                    U = self._U()
+                    g = self.G_inv @ (U.T @ x) if self.patterns else np.zeros(0)
+                    q = len(self.patterns)
+                    G_inv = np.empty((q + 1, q + 1), dtype=np.float64)
+                    G_inv[:q, :q] = self.G_inv + np.outer(g, g) / s
+                    G_inv[:q, q] = G_inv[q, :q] = -g / s
+                    G_inv[q, q] = 1.0 / s
+                    self.G_inv = G_inv
+            else:
+                # Patrón linealmente dependiente: P no cambia y U^T U deja de
+                # ser invertible; las bajas pasan a reentrenar desde cero
+                self.G_inv = None
+        self.patterns.append(x_pm1.reshape(-1, 1).astype(np.int8))
+        return len(self.patterns) - 1
+
+    def remove_pattern(self, index: int) -> np.ndarray:
+        x_pm1 = self.patterns[index]
+        if self.rule == "hebb":
+            x = x_pm1.reshape(-1).astype(np.float64)
+            self.P -= np.outer(x, x)
+            del self.patterns[index]
+        elif self.G_inv is None:
+            del self.patterns[index]
+            self.rebuild()
+        else:
+            # z = U G^-1 e_k es ortogonal al resto de los patrones y |z|^2 = G^-1_kk:
+            # P' = P - z z^T / G^-1_kk; G^-1 se reduce por complemento de Schur
+            U = self._U()
+            g = self.G_inv[:, index]
+            d = float(g[index])
+            z = U @ g
+            self.P -= np.outer(z, z) / d
+            keep = np.arange(len(self.patterns)) != index
+            self.G_inv = self.G_inv[np.ix_(keep, keep)] - np.outer(g[keep], g[keep]) / d
+            del self.patterns[index]
+        return x_pm1
+
+    def _U(self) -> np.ndarray:
+        if not self.patterns:
+            return np.zeros((self.n, 0), dtype=np.float64)
+        return np.hstack(self.patterns).astype(np.float64)
+
+    def _full_retrain(self) -> Hopfield:
+        if self.rule == "hebb":
+            return Hopfield.train_hebb(self.patterns)
+        return Hopfield.train_pseudoinverse(self.patterns)
+
+    def network(self) -> Hopfield:
+        W = self.P.copy()
+        np.fill_diagonal(W, 0.0)
+        return Hopfield(n=self.n, W=W)
+
+    def check_drift(self) -> float:
+        # Máxima diferencia absoluta contra un reentrenamiento completo
+        if not self.patterns:
+            return float(np.abs(self.P).max(initial=0.0))
+        return float(np.abs(self.network().W - self._full_retrain().W).max())
+
+    def rebuild(self) -> None:
+        # Reentrenamiento completo (descarta el error numérico acumulado)
+        U = self._U()
+        if self.rule == "hebb":
+            self.P = U @ U.T
+            return
+        G = U.T @ U
+        G_inv = np.linalg.pinv(G)
+        self.P = U @ G_inv @ U.T
+        rank = np.linalg.matrix_rank(G) if len(self.patterns) else 0
+        self.G_inv = G_inv if rank == len(self.patterns) else None
+
+def pack_pm1(x: np.ndarray) -> np.ndarray:
+    # ±1 -> bits (1 = +1). Acepta un vector (n,) / (n, 1) o un lote (n x B),
+    # que se empaqueta como (B x ceil(n/8)).
+    x = np.asarray(x)
+    if x.ndim == 2 and x.shape[1] > 1:
+        return np.packbits(x.T > 0, axis=1)
+    return np.packbits(x.reshape(-1) > 0)
+
+def unpack_pm1(bits: np.ndarray, n: int) -> np.ndarray:
+    # Inversa de pack_pm1: vector (n, 1) o lote (n x B), en int8 ±1.
+    bits = np.asarray(bits)
+    if bits.ndim == 2:
+        x = np.unpackbits(bits, axis=1, count=n).T
+    else:
+        x = np.unpackbits(bits, count=n).reshape(n, 1)
+    return np.where(x > 0, 1, -1).astype(np.int8)
+
+def hebb_weight_dtype(num_patterns: int) -> type:
+    # |W_ij| <= cantidad de patrones: el entero más chico que lo representa
+    for dtype in (np.int8, np.int16):
+        if num_patterns <= np.iinfo(dtype).max:
+            return dtype
+    return np.int32
+
+@dataclass
+class CompactHopfield:
+    # Red de Hebb compacta: W entero (int8/int16) y estados empaquetados en bits.
+    n: int
+    W: np.ndarray
+    num_patterns: int
+    block_rows: int = 1024
+
+    @staticmethod
+    def train_hebb(patterns_pm1: List[np.ndarray], block_rows: int = 1024) -> "CompactHopfield":
+        n = patterns_pm1[0].size
+        q = len(patterns_pm1)
+        dtype = hebb_weight_dtype(q)
+        U = np.hstack([p.reshape(n, 1) for p in patterns_pm1]).astype(np.float32)  # n x q
+        W = np.empty((n, n), dtype=dtype)
+        # Por bloques de filas: el temporal float32 es de block_rows x n (exacto hasta 2^24)
+        for r0 in range(0, n, block_rows):
+            r1 = min(n, r0 + block_rows)
+            W[r0:r1] = (U[r0:r1] @ U.T).astype(dtype)
+        np.fill_diagonal(W, 0)
+        return CompactHopfield(n=n, W=W, num_patterns=q, block_rows=block_rows)
+
+    def nbytes(self) -> int:
+        return int(self.W.nbytes)
+
+    def fields(self, X: np.ndarray) -> np.ndarray:
+        # H = W X por bloques de filas en float32 (sumas enteras exactas)
+        X = X.reshape(self.n, -1).astype(np.float32)
+        H = np.empty(X.shape, dtype=np.float32)
+        for r0 in range(0, self.n, self.block_rows):
+            r1 = min(self.n, r0 + self.block_rows)
+            H[r0:r1] = self.W[r0:r1].astype(np.float32) @ X
+        return H
+
+    def energy(self, bits: np.ndarray) -> float:
+        x = unpack_pm1(bits, self.n).astype(np.float32)
+        return float(-0.5 * (x.T @ self.fields(x)).item())
+
+    def recall(
+        self,
+        bits: np.ndarray,
+        max_iters: int = 50,
+        asynchronous: bool = False,
+        rng: Optional[np.random.Generator] = None
+    ) -> Tuple[np.ndarray, Any]:
+        # Entrada y salida empaquetadas en bits. Un vector -> (bits, iters);
+        # un lote (B x ceil(n/8)) -> (bits del lote, iters por sonda), sólo síncrono.
+        bits = np.asarray(bits, dtype=np.uint8)
+        if bits.ndim == 2:
+            if asynchronous:
+                raise ValueError("La recuperación por lotes compacta es síncrona")
+            X = unpack_pm1(bits, self.n).astype(np.float32)
+            iters = np.full(X.shape[1], max_iters, dtype=np.int64)
+            active = np.arange(X.shape[1])
+            for it in range(max_iters):
+                if active.size == 0:
+                    break
+                Xa = X[:, active]
+                X_new = np.where(self.fields(Xa) >= 0, 1.0, -1.0).astype(np.float32)
+                done = np.all(X_new == Xa, axis=0)
+                X[:, active] = X_new
+                iters[active[done]] = it + 1
+                active = active[~done]
+            return pack_pm1(X), iters
+
+        x = unpack_pm1(bits, self.n).reshape(-1).astype(np.int32)
+        if asynchronous:
+            if rng is None:
+                rng = np.random.default_rng(0)
+            # Mismo esquema que Hopfield.recall: campo local entero actualizado
+            # con una fila de W (simétrica) por cada neurona que cambia
+            h = self.fields(x).reshape(-1).astype(np.int64)
+            for it in range(max_iters):
+                changed = False
+                for i in rng.permutation(self.n):
+                    new_state = 1 if h[i] >= 0 else -1
+                    if new_state != x[i]:
+                        h += (new_state - x[i]) * self.W[i].astype(np.int64)
+                        x[i] = new_state
+                        changed = True
+                if not changed:
+                    return pack_pm1(x), it + 1
+            return pack_pm1(x), max_iters
+        for it in range(max_iters):
+            x_new = np.where(self.fields(x).reshape(-1) >= 0, 1, -1).astype(np.int32)
+            if np.array_equal(x_new, x):
+                return pack_pm1(x_new), it + 1
+            x = x_new
+        return pack_pm1(x), max_iters
+
+def compare_compact(side: int = 64, num_patterns: int = 20, num_probes: int = 200,
+                    noise: float = 0.2, seed: int = 0) -> Dict[str, Any]:
+    # Memoria y throughput de recuperación síncrona por lotes: float64 vs compacta
+    rng = np.random.default_rng(seed)
+    n = side * side
+    patterns = [np.where(rng.random((n, 1)) < 0.5, 1, -1).astype(np.int8) for _ in range(num_patterns)]
+    probes = np.hstack([add_noise_pm1(patterns[k % num_patterns], noise, rng) for k in range(num_probes)])
+    targets = np.hstack([patterns[k % num_patterns] for k in range(num_probes)])
+
+    t0 = time.perf_counter()
+    dense = Hopfield.train_hebb(patterns)
+    t1 = time.perf_counter()
+    X_dense, _ = dense.recall_batch(probes)
+    t2 = time.perf_counter()
+    compact = CompactHopfield.train_hebb(patterns)
+    t3 = time.perf_counter()
+    bits, _ = compact.recall(pack_pm1(probes))
+    t4 = time.perf_counter()
+    X_compact = unpack_pm1(bits, n)
+
+    return {
+        "n": n,
+        "patterns": num_patterns,
+        "probes": num_probes,
+        "weight_dtype": str(compact.W.dtype),
+        "dense_mb": dense.W.nbytes / 2**20,
+        "compact_mb": compact.nbytes() / 2**20,
+        "state_bytes_dense": n * 8,
+        "state_bytes_packed": int(np.ceil(n / 8)),
+        "dense_train_s": t1 - t0,
+        "compact_train_s": t3 - t2,
+        "dense_probes_per_s": num_probes / (t2 - t1),
+        "compact_probes_per_s": num_probes / (t4 - t3),
+        "same_result": bool(np.array_equal(X_dense, X_compact)),
+        "acc": float(np.mean(X_compact == targets)),
+    }
+
+def random_connectivity(n: int, k: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    # Cada neurona elige k vecinas al azar; se simetriza (aristas no dirigidas)
+    rows = np.repeat(np.arange(n), k)
+    cols = rng.integers(0, n - 1, size=n * k)
+    cols[cols >= rows] += 1  # sin auto-conexiones
+    return _symmetric_edges(n, rows, cols)
+
+def local_connectivity(shape: Tuple[int, int], radius: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    # Vecindad 2-D de radio `radius` (Chebyshev) sobre la grilla de la imagen
+    h, w = shape
+    ii, jj = np.divmod(np.arange(h * w), w)
+    rows, cols = [], []
+    for di in range(-radius, radius + 1):
+        for dj in range(-radius, radius + 1):
+            if di == 0 and dj == 0:
+                continue
+            ok = (ii + di >= 0) & (ii + di < h) & (jj + dj >= 0) & (jj + dj < w)
+            rows.append((ii * w + jj)[ok])
+            cols.append(((ii + di) * w + jj + dj)[ok])
+    return _symmetric_edges(h * w, np.concatenate(rows), np.concatenate(cols))
+
+def _symmetric_edges(n: int, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Une (i, j) y (j, i), elimina duplicados y ordena por fila (orden CSR)
+    keys = np.unique(np.concatenate([rows * n + cols, cols * n + rows]))
+    return keys // n, keys % n
+
+@dataclass
+class SparseHopfield:
+    # Red diluida: W en formato CSR (indptr, indices, data), simétrica y sin diagonal
+    n: int
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+
+    @staticmethod
+    def train_hebb(patterns_pm1: List[np.ndarray], rows: np.ndarray, cols: np.ndarray) -> "SparseHopfield":
+        # Hebb restringido a las aristas dadas (ordenadas por fila)
+        n = patterns_pm1[0].size
+        data = np.zeros(rows.size, dtype=np.float64)
+        for x in patterns_pm1:
+            x = x.reshape(-1).astype(np.float64)
+            data += x[rows] * x[cols]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return SparseHopfield(n=n, indptr=indptr, indices=cols.astype(np.int64), data=data)
+
+    def nbytes(self) -> int:
+        return int(self.indptr.nbytes + self.indices.nbytes + self.data.nbytes)
+
+    def fields(self, X: np.ndarray) -> np.ndarray:
+        # H = W X para un vector (n,) / (n, 1) o un lote (n x B)
+        X = X.reshape(self.n, -1).astype(np.float64)
+        prod = self.data[:, None] * X[self.indices]
+        H = np.zeros(X.shape, dtype=np.float64)
+        nonempty = self.indptr[:-1] < self.indptr[1:]
+        if prod.shape[0]:
+            H[nonempty] = np.add.reduceat(prod, self.indptr[:-1][nonempty], axis=0)
+        return H
+
+    def energy(self, x: np.ndarray) -> float:
+        x = x.reshape(self.n, 1).astype(np.float64)
+        return float(-0.5 * (x.T @ self.fields(x)).item())
+
+    def recall(
+        self,
+        x0: np.ndarray,
+        max_iters: int = 50,
+        asynchronous: bool = True,
+        rng: Optional[np.random.Generator] = None,
+        track_energy: bool = False
+    ) -> Tuple[np.ndarray, int, Optional[List[float]]]:
+        # Misma interfaz que Hopfield.recall; la rama asíncrona actualiza el
+        # campo local sólo en las vecinas de la neurona que cambia
+        x = x0.reshape(-1).astype(np.float64).copy()
+        h = self.fields(x).reshape(-1)
+        E = float(-0.5 * (x @ h))
+        energy_list = [E] if track_energy else None
+        if asynchronous:
+            if rng is None:
+                rng = np.random.default_rng(0)
+            for it in range(max_iters):
+                changed = False
+                for i in rng.permutation(self.n):
+                    new_state = 1.0 if h[i] >= 0 else -1.0
+                    if new_state != x[i]:
+                        delta = new_state - x[i]
+                        E -= delta * h[i]
+                        x[i] = new_state
+                        lo, hi = self.indptr[i], self.indptr[i + 1]
+                        h[self.indices[lo:hi]] += delta * self.data[lo:hi]
+                        changed = True
+                if track_energy:
+                    energy_list.append(E)
+                if not changed:
+                    return x.reshape(-1, 1).astype(np.int8), it + 1, energy_list
+            return x.reshape(-1, 1).astype(np.int8), max_iters, energy_list
+        for it in range(max_iters):
+            x_new = np.where(h >= 0, 1.0, -1.0)
+            if np.array_equal(x_new, x):
+                if track_energy:
+                    energy_list.append(float(-0.5 * (x_new @ h)))
+                return x_new.reshape(-1, 1).astype(np.int8), it + 1, energy_list
+            x = x_new
+            h = self.fields(x).reshape(-1)
+            if track_energy:
+                energy_list.append(float(-0.5 * (x @ h)))
+        return x.reshape(-1, 1).astype(np.int8), max_iters, energy_list
+
+def compare_sparse(k: int = 12, radius: int = 2, trials: int = 20, seed: int = 0) -> List[str]:
+    # Exactitud media y memoria: red densa vs diluida (k aleatorias / vecindad local)
+    # con los patrones anillo, cruz y L y los niveles de ruido de main()
+    rng = np.random.default_rng(seed)
+    shape = (10, 10)
+    X_targets = [to_pm1(p) for p in (pattern_ring(radius=3.0, thickness=1.2), pattern_plus(), pattern_L())]
+    names = ["Ring", "Plus", "L-shape"]
+    n = X_targets[0].size
+    nets: List[Tuple[str, Any, int]] = []
+    dense = Hopfield.train_hebb(X_targets)
+    nets.append(("Dense", dense, dense.W.nbytes))
+    for label, (rows, cols) in [(f"Random k={k}", random_connectivity(n, k, rng)),
+                                (f"Local r={radius}", local_connectivity(shape, radius))]:
+        net = SparseHopfield.train_hebb(X_targets, rows, cols)
+        nets.append((label, net, net.nbytes()))
+    lines = []
+    for label, net, nbytes in nets:
+        lines.append(f"== {label} | memoria={nbytes / 1024:.1f} KiB ==")
+        for name, x_true in zip(names, X_targets):
+            accs = []
+            for nl in (0.10, 0.30, 0.50):
+                acc = 0.0
+                for t in range(trials):
+                    noisy = add_noise_pm1(x_true, flip_ratio=nl, rng=rng)
+                    x_rec, _, _ = net.recall(noisy, max_iters=60, rng=np.random.default_rng(t))
+                    acc += 1.0 - hamming_distance(x_rec, x_true) / x_true.size
+                accs.append(f"noise={int(nl*100)}% acc={acc / trials:.3f}")
+            lines.append(f"  {name:8s} | " + " | ".join(accs))
+    return lines
+
+# Contenedor binario para datasets y modelos: firma (8 bytes), largo del
+# encabezado (uint64), encabezado JSON (dtype, forma y metadatos) y los datos
+# crudos alineados a 64 bytes, que se abren con np.memmap sin copiarlos.
+MAPPED_MAGIC = b"HOPFMM01"
+
+def _write_mapped(path: str, meta: Dict[str, Any], shape: Tuple[int, ...], dtype: Any) -> np.memmap:
+    header = dict(meta, dtype=np.dtype(dtype).str, shape=list(shape))
+    raw = json.dumps(header).encode("utf-8")
+    offset = len(MAPPED_MAGIC) + 8 + len(raw)
+    raw += b" " * (-offset % 64)
+    with open(path, "wb") as f:
+        f.write(MAPPED_MAGIC)
+        f.write(np.uint64(len(raw)).tobytes())
+        f.write(raw)
+    offset = len(MAPPED_MAGIC) + 8 + len(raw)
+    return np.memmap(path, dtype=dtype, mode="r+", offset=offset, shape=tuple(shape))
+
+def _open_mapped(path: str, mode: str = "r") -> Tuple[Dict[str, Any], np.memmap]:
+    with open(path, "rb") as f:
+        if f.read(len(MAPPED_MAGIC)) != MAPPED_MAGIC:
+            raise ValueError(f"{path}: no es un archivo del formato mapeado de Hopfield")
+        length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(length).decode("utf-8"))
+    offset = len(MAPPED_MAGIC) + 8 + length
+    data = np.memmap(path, dtype=np.dtype(header["dtype"]), mode=mode, offset=offset,
+                     shape=tuple(header["shape"]))
+    return header, data
+
+def save_pattern_dataset(path: str, patterns01: Any, shape: Optional[Tuple[int, ...]] = None) -> None:
+    # patterns01: arreglo (cantidad, *forma) o iterable de patrones 0/1 de igual forma.
+    # Cada patrón se guarda empaquetado en bits (una fila de ceil(n/8) bytes).
+    patterns01 = patterns01 if isinstance(patterns01, np.ndarray) else np.stack(list(patterns01))
+    shape = tuple(shape or patterns01.shape[1:])
+    n = int(np.prod(shape))
+    count = patterns01.shape[0]
+    data = _write_mapped(path, {"kind": "patterns", "pattern_shape": list(shape), "n": n},
+                         (count, (n + 7) // 8), np.uint8)
+    for start in range(0, count, 4096):
+        block = patterns01[start:start + 4096].reshape(-1, n)
+        data[start:start + block.shape[0]] = np.packbits(block > 0, axis=1)
+    data.flush()
+    del data
+
+class PatternDataset:
+    # Colección de patrones en disco, leída por memory-mapping: abrir es
+    # instantáneo y sólo se leen las páginas de los patrones accedidos.
+    def __init__(self, path: str):
+        header, self.bits = _open_mapped(path)
+        if header.get("kind") != "patterns":
+            raise ValueError(f"{path}: no es un dataset de patrones")
+        self.shape = tuple(header["pattern_shape"])
+        self.n = int(header["n"])
+
+    def __len__(self) -> int:
+        return self.bits.shape[0]
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        # Patrón en ±1 como vector columna (n, 1), igual que to_pm1
+        return unpack_pm1(np.asarray(self.bits[index]), self.n)
+
+    def batch(self, start: int, stop: int) -> np.ndarray:
+        # Lote (n x B) en ±1 para recall_batch
+        return unpack_pm1(np.asarray(self.bits[start:stop]), self.n)
+
+    def as_01(self, index: int) -> np.ndarray:
+        return to_01(self[index], self.shape)
+
+def save_network(path: str, net: Any, rule: str = "", pattern_shape: Optional[Tuple[int, ...]] = None,
+                 **metadata: Any) -> None:
+    # Guarda W y metadatos; acepta Hopfield o CompactHopfield
+    meta = dict(metadata, kind="network", cls=type(net).__name__, n=net.n, rule=rule,
+                pattern_shape=list(pattern_shape) if pattern_shape else None)
+    if isinstance(net, CompactHopfield):
+        meta["num_patterns"] = net.num_patterns
+    W = _write_mapped(path, meta, net.W.shape, net.W.dtype)
+    for r0 in range(0, net.n, 4096):
+        W[r0:r0 + 4096] = net.W[r0:r0 + 4096]
+    W.flush()
+    del W
+
+def load_network(path: str) -> Tuple[Any, Dict[str, Any]]:
+    # Abre la red sin leer W: la matriz queda como np.memmap de sólo lectura
+    # y la recuperación va trayendo las páginas a medida que las usa
+    meta, W = _open_mapped(path)
+    if meta.get("kind") != "network":
+        raise ValueError(f"{path}: no es un modelo de Hopfield")
+    if meta["cls"] == "CompactHopfield":
+        return CompactHopfield(n=meta["n"], W=W, num_patterns=meta["num_patterns"]), meta
+    return Hopfield(n=meta["n"], W=W), meta
+
+def random_patterns(count: int, seed: int, shape: Tuple[int, int] = (10, 10)) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [(rng.random(shape) < 0.5).astype(np.int8) for _ in range(count)]
+
+# Conjuntos de patrones (0/1) disponibles para el barrido de robustez
+PATTERN_SETS = {
+    "demo": lambda: [("Ring", pattern_ring(radius=3.0, thickness=1.2)),
+                     ("Plus", pattern_plus()),
+                     ("L-shape", pattern_L())],
+    "random5": lambda: [(f"R{i}", p) for i, p in enumerate(random_patterns(5, seed=5))],
+}
+
+TRAINING_RULES = {
+    "hebb": Hopfield.train_hebb,
+    "pseudoinverse": Hopfield.train_pseudoinverse,
+}
+
+# Redes entrenadas de cada proceso trabajador, vistas de sólo lectura sobre
+# memoria compartida: (regla, conjunto) -> Hopfield
+_SWEEP_NETS: Dict[Tuple[str, str], Hopfield] = {}
+_SWEEP_SHM: List[shared_memory.SharedMemory] = []
+
+def _sweep_init(shared: Dict[Tuple[str, str], Tuple[str, int]]):
+    for key, (shm_name, n) in shared.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        W = np.ndarray((n, n), dtype=np.float64, buffer=shm.buf)
+        W.flags.writeable = False
+        _SWEEP_SHM.append(shm)
+        _SWEEP_NETS[key] = Hopfield(n=n, W=W)
+
+def sweep_cell_key(rule: str, pattern_set: str, pattern: str, noise: float, mode: str) -> str:
+    return f"{rule}|{pattern_set}|{pattern}|{noise:.4f}|{mode}"
+
+# Subir al cambiar la semántica de un ensayo (ruido, recuperación, métricas):
+# invalida las celdas ya guardadas en disco
+SWEEP_CACHE_VERSION = 1
+
+def pattern_set_digest(pattern_set: str) -> str:
+    # Huella del contenido del conjunto (nombres, formas y píxeles), para que
+    # editar un patrón no reutilice resultados viejos de la caché
+    h = hashlib.sha1()
+    for name, pattern in PATTERN_SETS[pattern_set]():
+        arr = np.ascontiguousarray(pattern, dtype=np.int8)
+        h.update(f"{name}|{arr.shape}|".encode("utf-8"))
+        h.update(arr.tobytes())
+    return h.hexdigest()[:16]
+
+def sweep_cache_key(key: str, base_seed: int, max_iters: int, digest: str) -> str:
+    # Identidad completa de una celda en disco: la celda del barrido más todo
+    # lo que cambia sus ensayos
+    return f"v{SWEEP_CACHE_VERSION}|{key}|seed={base_seed}|iters={max_iters}|{digest}"
+
+def _sweep_cell(key: str, trial_ids: List[int], base_seed: int, max_iters: int) -> Tuple[str, List[List[float]]]:
+    # Cada ensayo usa su propia semilla derivada de (semilla base, celda, ensayo):
+    # el resultado no depende del orden ni del proceso que lo ejecute
+    rule, pattern_set, pattern, noise, mode = key.split("|")
+    net = _SWEEP_NETS[(rule, pattern_set)]
+    x_true = to_pm1(dict(PATTERN_SETS[pattern_set]())[pattern])
+    cell_id = zlib.crc32(key.encode("utf-8"))
+    out = []
+    for t in trial_ids:
+        rng = np.random.default_rng(np.random.SeedSequence([base_seed, cell_id, t]))
+        noisy = add_noise_pm1(x_true, flip_ratio=float(noise), rng=rng)
+        x_rec, iters, _ = net.recall(noisy, max_iters=max_iters, asynchronous=(mode == "async"), rng=rng)
+        d = hamming_distance(x_rec, x_true)
+        out.append([t, 1.0 - d / x_true.size, iters, float(d == 0)])
+    return key, out
+
+def run_sweep(
+    rules: List[str],
+    pattern_sets: List[str],
+    noise_levels: List[float],
+    modes: List[str],
+    trials: int = 20,
+    seed: int = 123,
+    workers: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    max_iters: int = 60
+) -> Dict[str, List[List[float]]]:
+    # Barrido regla x conjunto x patrón x ruido x modo repartido en un pool de
+    # procesos. Las celdas terminadas se guardan en `cache_dir` (un JSON por
+    # celda) y al reanudar sólo se calculan los ensayos que faltan.
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    digests = {pset: pattern_set_digest(pset) for pset in pattern_sets}
+    cache_keys: Dict[str, str] = {}
+
+    def cache_path(key: str) -> str:
+        name = hashlib.sha1(cache_keys[key].encode("utf-8")).hexdigest()[:16]
+        return os.path.join(cache_dir, f"{name}.json")
+
+    results: Dict[str, List[List[float]]] = {}
+    pending: List[Tuple[str, List[int]]] = []
+    for rule in rules:
+        for pset in pattern_sets:
+            for pname, _ in PATTERN_SETS[pset]():
+                for nl in noise_levels:
+                    for mode in modes:
+                        key = sweep_cell_key(rule, pset, pname, nl, mode)
+                        cache_keys[key] = sweep_cache_key(key, seed, max_iters, digests[pset])
+                        done: List[List[float]] = []
+                        if cache_dir and os.path.exists(cache_path(key)):
+                            with open(cache_path(key), encoding="utf-8") as f:
+                                cached = json.load(f)
+                            if cached.get("cache_key") == cache_keys[key]:
+                                done = [r for r in cached["trials"] if r[0] < trials]
+                        results[key] = done
+                        missing = sorted(set(range(trials)) - {int(r[0]) for r in done})
+                        if missing:
+                            pending.append((key, missing))
+
+    if not pending:
+        return results
+
+    # Entrenamiento en el proceso principal; los pesos se comparten sin copiarlos
+    shms: List[shared_memory.SharedMemory] = []
+    shared: Dict[Tuple[str, str], Tuple[str, int]] = {}
+    try:
+        for rule in rules:
+            for pset in pattern_sets:
+                net = TRAINING_RULES[rule]([to_pm1(p) for _, p in PATTERN_SETS[pset]()])
+                shm = shared_memory.SharedMemory(create=True, size=net.W.nbytes)
+                np.ndarray(net.W.shape, dtype=np.float64, buffer=shm.buf)[:] = net.W
+                shms.append(shm)
+                shared[(rule, pset)] = (shm.name, net.n)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_sweep_init, initargs=(shared,)) as pool:
+            futures = [pool.submit(_sweep_cell, key, missing, seed, max_iters) for key, missing in pending]
+            for future in as_completed(futures):
+                key, rows = future.result()
+                results[key] = sorted(results[key] + rows)
+                if cache_dir:
+                    tmp = cache_path(key) + ".tmp"
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        json.dump({"key": key, "cache_key": cache_keys[key], "trials": results[key]}, f)
+                    os.replace(tmp, cache_path(key))
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+    return results
+
+def sweep_table(results: Dict[str, List[List[float]]]) -> List[Dict[str, Any]]:
+    # Agregado por (regla, conjunto, modo, ruido): exactitud media, tasa de
+    # recuperación exacta e iteraciones medias sobre patrones y ensayos
+    groups: Dict[Tuple[str, str, str, float], List[List[float]]] = {}
+    for key, rows in results.items():
+        rule, pset, _, noise, mode = key.split("|")
+        groups.setdefault((rule, pset, mode, float(noise)), []).extend(rows)
+    table = []
+    for (rule, pset, mode, noise), rows in sorted(groups.items()):
+        arr = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        table.append({
+            "rule": rule, "patterns": pset, "mode": mode, "noise": noise,
+            "trials": int(arr.shape[0]),
+            "acc": float(arr[:, 1].mean()) if arr.size else float("nan"),
+            "exact": float(arr[:, 3].mean()) if arr.size else float("nan"),
+            "iters": float(arr[:, 2].mean()) if arr.size else float("nan"),
+        })
+    return table
+
+def visualize_triplets(triplets: List[Tuple[np.ndarray, np.ndarray, np.ndarray]], titles: List[str], out_path: str,
+                       shape: Tuple[int, ...] = (10, 10)):
     rows = len(triplets)
     fig, axes = plt.subplots(rows, 3, figsize=(6, 2 * rows))
     if rows == 1:
         axes = np.array([axes])
     for r, (target_pm1, noisy_pm1, recalled_pm1) in enumerate(triplets):
-        mats = [to_01(target_pm1), to_01(noisy_pm1), to_01(recalled_pm1)]
+        mats = [to_01(target_pm1, shape), to_01(noisy_pm1, shape), to_01(recalled_pm1, shape)]
         for c in range(3):
             ax = axes[r, c]
             ax.imshow(mats[c], interpolation='nearest')
@@ -196,4 +925,47 @@ def main(seed: int = 123):
     print(f"Saved: {img_grid_path}, energy curves with prefix {energy_prefix}, report hopfield_report.txt")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Prototipo de red de Hopfield (10x10).")
+    parser.add_argument("--seed", type=int, default=123, help="Semilla del experimento (default: 123)")
+    parser.add_argument("--compare-compact", type=int, metavar="SIDE", default=None,
+                        help="Compara memoria/throughput float64 vs compacta con patrones SIDE x SIDE")
+    parser.add_argument("--patterns", type=int, default=20, help="Patrones para --compare-compact")
+    parser.add_argument("--compare-sparse", action="store_true",
+                        help="Compara exactitud/memoria de la red densa vs diluida (CSR)")
+    sweep = parser.add_argument_group("barrido de robustez al ruido")
+    sweep.add_argument("--sweep", action="store_true", help="Ejecuta el barrido paralelo")
+    sweep.add_argument("--rules", nargs="+", choices=list(TRAINING_RULES), default=list(TRAINING_RULES))
+    sweep.add_argument("--pattern-sets", nargs="+", choices=list(PATTERN_SETS), default=["demo"])
+    sweep.add_argument("--noise-levels", type=float, nargs="+",
+                       default=[round(0.1 * i, 1) for i in range(11)], help="Fracciones de bits invertidos")
+    sweep.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    sweep.add_argument("--trials", type=int, default=20, help="Ensayos por celda (default: 20)")
+    sweep.add_argument("--workers", type=int, default=None, help="Procesos (default: todos los núcleos)")
+    sweep.add_argument("--cache-dir", default="hopfield_sweep_cache",
+                       help="Directorio de celdas terminadas para reanudar (default: hopfield_sweep_cache)")
+    sweep.add_argument("--csv", default=None, help="Guarda la tabla agregada en CSV")
+    args = parser.parse_args()
+    if args.sweep:
+        t0 = time.perf_counter()
+        results = run_sweep(args.rules, args.pattern_sets, args.noise_levels, args.modes,
+                            trials=args.trials, seed=args.seed, workers=args.workers,
+                            cache_dir=args.cache_dir)
+        table = sweep_table(results)
+        print(f"{'rule':14s} {'patterns':9s} {'mode':5s} {'noise':>5s} {'trials':>6s} "
+              f"{'acc':>6s} {'exact':>6s} {'iters':>6s}")
+        for row in table:
+            print(f"{row['rule']:14s} {row['patterns']:9s} {row['mode']:5s} {int(row['noise']*100):4d}% "
+                  f"{row['trials']:6d} {row['acc']:6.3f} {row['exact']:6.3f} {row['iters']:6.2f}")
+        if args.csv:
+            with open(args.csv, "w", encoding="utf-8") as f:
+                f.write(",".join(table[0].keys()) + "\n" if table else "")
+                for row in table:
+                    f.write(",".join(str(v) for v in row.values()) + "\n")
+        print(f"{len(results)} celdas en {time.perf_counter() - t0:.2f} s")
+    elif args.compare_sparse:
+        print("\n".join(compare_sparse(seed=args.seed)))
+    elif args.compare_compact:
+        for key, value in compare_compact(args.compare_compact, args.patterns, seed=args.seed).items():
+            print(f"{key:22s}: {value:.4g}" if isinstance(value, float) else f"{key:22s}: {value}")
+    else:
+        main(args.seed)
@@ -1,26 +1,225 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
-import matplotlib.pyplot as plt
 
-def generate_test_image(width=200, height=200):
+def generate_test_image(width=200, height=200, num_lines=None, noise_density=0.0, rng=None):
     """
     Genera una imagen binaria simple con dos líneas brillantes
     sobre fondo oscuro: una horizontal y una diagonal.
+
+    Con `num_lines` se dibujan en cambio esa cantidad de rectas aleatorias
+    que cruzan la imagen, y con `noise_density` se encienden además esa
+    fracción de píxeles al azar (para los benchmarks de escalado).
     """
     img = np.zeros((height, width), dtype=np.uint8)
+    if rng is None:
+        rng = np.random.default_rng(0)
 
-    # Línea horizontal en el centro
-    img[height // 2, 20:180] = 255
+    if num_lines is None:
+        # Línea horizontal en el centro
+        img[height // 2, 20:180] = 255
 
-    # Línea diagonal desde abajo-izquierda hacia arriba-derecha
-    for i in range(40, 160):
-        y = height - i - 1
-        x = i
-        if 0 <= y < height and 0 <= x < width:
-            img[y, x] = 255
+        # Línea diagonal desde abajo-izquierda hacia arriba-derecha
+        for i in range(40, 160):
+            y = height - i - 1
+            x = i
+            if 0 <= y < height and 0 <= x < width:
+                img[y, x] = 255
+    else:
+        # Rectas entre dos puntos aleatorios de bordes opuestos de la imagen
+        for _ in range(num_lines):
+            if rng.random() < 0.5:
+                x0, x1 = 0, width - 1
+                y0, y1 = rng.integers(0, height, size=2)
+            else:
+                y0, y1 = 0, height - 1
+                x0, x1 = rng.integers(0, width, size=2)
+            n = max(abs(x1 - x0), abs(y1 - y0)) + 1
+            xs = np.rint(np.linspace(x0, x1, n)).astype(int)
+            ys = np.rint(np.linspace(y0, y1, n)).astype(int)
+            img[ys, xs] = 255
+
+    if noise_density > 0:
+        img[rng.random((height, width)) < noise_density] = 255
 
     return img
 
-def hough_lines(binary_img, theta_res=1, rho_res=1):
+def hough_space(shape, theta_res=1, rho_res=1):
+    """
+    Discretiza el espacio de parámetros (ρ, θ) para una imagen de tamaño `shape`.
+
+    Retorna
+    -------
+    thetas : np.ndarray
+        Vector de valores de theta (en radianes).
+    rhos : np.ndarray
+        Vector de valores de rho.
+    diag_len : int
+        Diagonal de la imagen (desplazamiento para indexar rho >= 0).
+    """
+    height, width = shape
+
+    # Theta en grados: de -90 a 90 (sin incluir 90 para mantener longitud pareja)
+    thetas = np.deg2rad(np.arange(-90.0, 90.0, theta_res))
+
+    # Longitud máxima posible de rho (diagonal de la imagen)
+    diag_len = int(np.ceil(np.sqrt(width * width + height * height)))
+    rhos = np.arange(-diag_len, diag_len + 1, rho_res)
+
+    return thetas, rhos, diag_len
+
+def vote_loop(x_idxs, y_idxs, thetas, diag_len, accumulator):
+    """
+    Motor de referencia: doble bucle en Python sobre píxeles y ángulos.
+    Suma los votos directamente sobre `accumulator`.
+    """
+    for x, y in zip(x_idxs, y_idxs):
+        for theta_idx, theta in enumerate(thetas):
+            rho = int(round(x * np.cos(theta) + y * np.sin(theta)))
+            rho_idx = rho + diag_len  # desplazamos para que el índice sea >= 0
+            accumulator[rho_idx, theta_idx] += 1
+
+def vote_counts(x_idxs, y_idxs, cos_t, sin_t, diag_len, shape):
+    """
+    Votos de los píxeles dados sobre un acumulador de forma `shape`, a partir
+    de tablas cos/sin ya calculadas. Retorna un arreglo int64 de esa forma.
+    """
+    num_rhos, num_thetas = shape
+    x = np.asarray(x_idxs)[:, None]
+    y = np.asarray(y_idxs)[:, None]
+    rho_idxs = np.rint(x * cos_t + y * sin_t).astype(np.int64) + diag_len
+
+    # Índice plano rho_idx * num_thetas + theta_idx
+    flat = rho_idxs * num_thetas + np.arange(num_thetas)
+    votes = np.bincount(flat.ravel(), minlength=num_rhos * num_thetas)
+    if votes.size > num_rhos * num_thetas:
+        raise IndexError("índice de rho fuera del acumulador")
+    return votes.reshape(shape)
+
+def vote_vectorized(x_idxs, y_idxs, thetas, diag_len, accumulator):
+    """
+    Motor vectorizado: las tablas cos/sin se calculan una sola vez, todos los
+    índices de rho se obtienen como un único arreglo (píxeles x thetas) y los
+    votos se acumulan con `np.bincount` sobre el índice plano (rho, theta).
+
+    Produce exactamente el mismo acumulador que `vote_loop`: el producto y la
+    suma se evalúan en float64 en el mismo orden y `np.rint` redondea al par
+    más cercano igual que `round`.
+    """
+    if len(x_idxs) == 0:
+        return
+    votes = vote_counts(x_idxs, y_idxs, np.cos(thetas), np.sin(thetas), diag_len, accumulator.shape)
+    accumulator += votes.astype(accumulator.dtype)
+
+# Bytes de temporales por voto en `vote_vectorized` (x·cos, y·sin, índice de
+# rho e índice plano, todos de 8 bytes)
+BYTES_PER_VOTE = 32
+
+def smallest_accumulator_dtype(num_edges):
+    """
+    Tipo entero sin signo más chico que no desborda: cada celda del acumulador
+    recibe como máximo un voto por píxel de borde.
+    """
+    for dtype in (np.uint16, np.uint32):
+        if num_edges <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+def chunk_size_for(max_memory_mb, num_thetas, acc_size, acc_itemsize=8, workers=1):
+    """
+    Cantidad de píxeles por bloque para que, sumando los `workers` procesos,
+    quepan en `max_memory_mb`: los temporales de votación de cada proceso
+    (bloque x thetas), su conteo de `np.bincount` (int64 del tamaño del
+    acumulador) y los acumuladores parciales en memoria compartida (uno por
+    proceso, de `acc_itemsize` bytes por celda).
+
+    Lanza ValueError si el presupuesto no alcanza ni para un píxel por bloque.
+    """
+    fixed = workers * acc_size * (8 + acc_itemsize)
+    budget = int(max_memory_mb * 1024 * 1024) - fixed
+    chunk = budget // (workers * num_thetas * BYTES_PER_VOTE)
+    if chunk < 1:
+        needed = (fixed + workers * num_thetas * BYTES_PER_VOTE) / 2**20
+        raise ValueError(f"max_memory_mb={max_memory_mb} no alcanza para {workers} acumulador(es) de "
+                         f"{acc_size} celdas: se necesitan al menos {needed:.1f} MB")
+    return int(chunk)
+
+def vote_chunked(x_idxs, y_idxs, thetas, diag_len, accumulator, chunk_size=4096):
+    """
+    Motor por bloques: recorre los píxeles de borde en bloques de `chunk_size`
+    y vota cada bloque con `vote_vectorized`, acotando la memoria temporal.
+    """
+    for start in range(0, len(x_idxs), chunk_size):
+        stop = start + chunk_size
+        vote_vectorized(x_idxs[start:stop], y_idxs[start:stop], thetas, diag_len, accumulator)
+
+def _vote_partial(shm_name, shape, dtype, slot, x_idxs, y_idxs, thetas, diag_len, chunk_size):
+    """
+    Tarea de un proceso trabajador: vota su porción de píxeles en el
+    acumulador parcial `slot` alojado en memoria compartida.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        partials = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        vote_chunked(x_idxs, y_idxs, thetas, diag_len, partials[slot], chunk_size)
+    finally:
+        del partials
+        shm.close()
+
+def vote_parallel(x_idxs, y_idxs, thetas, diag_len, accumulator, chunk_size=4096, workers=None):
+    """
+    Motor multi-proceso: reparte los píxeles en `workers` porciones (una por
+    proceso); cada uno vota su porción en bloques de a lo sumo `chunk_size`
+    píxeles sobre su propio acumulador parcial en memoria compartida y al
+    final se reducen todos sumándolos en `accumulator`.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(x_idxs)))
+    if workers == 1:
+        vote_chunked(x_idxs, y_idxs, thetas, diag_len, accumulator, chunk_size)
+        return
+
+    shape = (workers,) + accumulator.shape
+    dtype = accumulator.dtype
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * dtype.itemsize)
+    try:
+        partials = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        partials[:] = 0
+        bounds = np.linspace(0, len(x_idxs), workers + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_vote_partial, shm.name, shape, dtype, slot,
+                            x_idxs[lo:hi], y_idxs[lo:hi], thetas, diag_len, chunk_size)
+                for slot, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))
+            ]
+            for future in futures:
+                future.result()
+        # Reducción: la suma total no desborda el tipo elegido para el acumulador
+        accumulator += partials.sum(axis=0, dtype=dtype)
+        del partials
+    finally:
+        shm.close()
+        shm.unlink()
+
+# Motores de votación disponibles para `hough_lines`
+VOTING_ENGINES = {
+    "loop": vote_loop,
+    "vectorized": vote_vectorized,
+    "chunked": vote_chunked,
+    "parallel": vote_parallel,
+}
+
+def hough_lines(binary_img, theta_res=1, rho_res=1, engine="vectorized",
+                max_memory_mb=256, workers=None):
     """
     Implementación simple de la transformada de Hough para rectas.
 
@@ -32,6 +231,19 @@ def hough_lines(binary_img, theta_res=1, rho_res=1):
         Resolución angular en grados para theta.
     rho_res : float
         Resolución en píxeles para rho.
+    engine : str
+        Motor de votación: "vectorized" (por defecto) o "loop" (doble bucle
+        de referencia), que producen el mismo acumulador uint64, o bien
+        "chunked" / "parallel", que procesan los píxeles por bloques (en un
+        proceso o repartidos en varios) y usan el tipo entero más chico que
+        no desborda (uint16/uint32).
+    max_memory_mb : float
+        Memoria máxima total de los motores "chunked" y "parallel"
+        (temporales de votación y acumuladores parciales de todos los
+        procesos); define el tamaño de cada bloque. Si no alcanza, se lanza
+        ValueError.
+    workers : int
+        Número de procesos del motor "parallel" (por defecto, todos los núcleos).
 
     Retorna
     -------
@@ -42,41 +254,150 @@ def hough_lines(binary_img, theta_res=1, rho_res=1):
     rhos : np.ndarray
         Vector de valores de rho.
     """
-    height, width = binary_img.shape
-
-    # Theta en grados: de -90 a 90 (sin incluir 90 para mantener longitud pareja)
-    thetas = np.deg2rad(np.arange(-90.0, 90.0, theta_res))
-
-    # Longitud máxima posible de rho (diagonal de la imagen)
-    diag_len = int(np.ceil(np.sqrt(width * width + height * height)))
-    rhos = np.arange(-diag_len, diag_len + 1, rho_res)
+    if engine not in VOTING_ENGINES:
+        raise ValueError(f"Motor desconocido: {engine!r} (opciones: {', '.join(VOTING_ENGINES)})")
 
-    # Acumulador: filas = rhos, columnas = thetas
-    accumulator = np.zeros((len(rhos), len(thetas)), dtype=np.uint64)
+    thetas, rhos, diag_len = hough_space(binary_img.shape, theta_res, rho_res)
 
     # Índices de los píxeles de borde (y, x)
     y_idxs, x_idxs = np.nonzero(binary_img)
 
+    # Acumulador: filas = rhos, columnas = thetas
+    options = {}
+    if engine in ("chunked", "parallel"):
+        dtype = smallest_accumulator_dtype(len(x_idxs))
+        procs = 1
+        if engine == "parallel":
+            procs = max(1, min(workers or os.cpu_count() or 1, len(x_idxs)))
+            options["workers"] = procs
+        options["chunk_size"] = chunk_size_for(max_memory_mb, len(thetas), len(rhos) * len(thetas),
+                                               np.dtype(dtype).itemsize, procs)
+    else:
+        dtype = np.uint64
+    accumulator = np.zeros((len(rhos), len(thetas)), dtype=dtype)
+
     # Votación en el acumulador
-    for x, y in zip(x_idxs, y_idxs):
-        for theta_idx, theta in enumerate(thetas):
-            rho = int(round(x * np.cos(theta) + y * np.sin(theta)))
-            rho_idx = rho + diag_len  # desplazamos para que el índice sea >= 0
-            accumulator[rho_idx, theta_idx] += 1
+    VOTING_ENGINES[engine](x_idxs, y_idxs, thetas, diag_len, accumulator, **options)
 
     return accumulator, thetas, rhos
 
-def find_peaks(accumulator, thetas, rhos, threshold, min_distance=10):
+def to_grayscale(img):
     """
-    Busca picos en el acumulador de Hough por encima de un umbral.
-    Aplica supresión de no-máximos para evitar detecciones duplicadas.
+    Convierte un cuadro a escala de grises float64 (promedio de canales si
+    la imagen es RGB/RGBA).
+    """
+    img = np.asarray(img, dtype=np.float64)
+    if img.ndim == 3:
+        img = img[..., :3].mean(axis=2)
+    return img
+
+def binarize(img, level=127):
+    """
+    Máscara de bordes (uint8 0/1) de una imagen en escala de grises.
+
+    `level` es un nivel de gris en 0-255. Si la imagen ya es binaria (sólo
+    0 y 1, por ejemplo un `.npy` de máscara) se toma `img > 0`; si es float
+    en [0, 1] (como la devuelve `matplotlib.image`) se lleva primero a 0-255.
+    """
+    img = to_grayscale(img)
+    if img.size == 0 or np.isin(img, (0, 1)).all():
+        return (img > 0).astype(np.uint8)
+    if img.min() >= 0 and img.max() <= 1:
+        img = img * 255
+    return (img > level).astype(np.uint8)
+
+def sobel_gradients(gray):
+    """
+    Gradientes de Sobel (gx, gy) de una imagen en escala de grises, con
+    replicación de borde para conservar el tamaño.
+    """
+    p = np.pad(to_grayscale(gray), 1, mode="edge")
+    gx = (p[:-2, 2:] + 2 * p[1:-1, 2:] + p[2:, 2:]) - (p[:-2, :-2] + 2 * p[1:-1, :-2] + p[2:, :-2])
+    gy = (p[2:, :-2] + 2 * p[2:, 1:-1] + p[2:, 2:]) - (p[:-2, :-2] + 2 * p[:-2, 1:-1] + p[:-2, 2:])
+    return gx, gy
+
+def edge_mask(gx, gy, edge_threshold=0.2):
+    """
+    Máscara de bordes: píxeles cuya magnitud de gradiente alcanza la fracción
+    `edge_threshold` de la magnitud máxima.
+    """
+    magnitude = np.hypot(gx, gy)
+    peak = magnitude.max()
+    if peak == 0:
+        return np.zeros(magnitude.shape, dtype=bool)
+    return magnitude >= edge_threshold * peak
+
+def hough_lines_gradient(gray_img, theta_res=1, rho_res=1, edge_threshold=0.2, theta_window=5):
+    """
+    Transformada de Hough orientada por el gradiente a partir de un cuadro en
+    escala de grises.
+
+    Calcula los gradientes de Sobel y la máscara de bordes; cada píxel de
+    borde vota sólo en los ángulos a ±`theta_window` grados de la dirección
+    de su gradiente (la normal de la recta), en lugar de en los 180.
 
     Parámetros
     ----------
-    min_distance : int
-        Distancia mínima entre picos en el espacio de Hough.
+    gray_img : np.ndarray (2D o 3D)
+        Cuadro en escala de grises (o RGB, que se promedia).
+    theta_res : float
+        Resolución angular en grados para theta.
+    rho_res : float
+        Resolución en píxeles para rho.
+    edge_threshold : float
+        Fracción de la magnitud máxima del gradiente para considerar borde.
+    theta_window : float
+        Semiancho en grados de la ventana de votación alrededor del gradiente.
+
+    Retorna
+    -------
+    accumulator, thetas, rhos : igual que `hough_lines`.
+    """
+    gx, gy = sobel_gradients(gray_img)
+    mask = edge_mask(gx, gy, edge_threshold)
+
+    thetas, rhos, diag_len = hough_space(mask.shape, theta_res, rho_res)
+    num_thetas = len(thetas)
+    accumulator = np.zeros((len(rhos), num_thetas), dtype=np.uint64)
+
+    y_idxs, x_idxs = np.nonzero(mask)
+    if len(x_idxs) == 0:
+        return accumulator, thetas, rhos
+
+    # Dirección del gradiente llevada a [-90°, 90°) (la recta no tiene sentido)
+    angles = np.rad2deg(np.arctan2(gy[y_idxs, x_idxs], gx[y_idxs, x_idxs]))
+    angles = (angles + 90.0) % 180.0 - 90.0
+    center = np.rint((angles + 90.0) / theta_res).astype(np.int64)
+
+    # Ventana de ángulos alrededor de cada gradiente; al salir de [-90°, 90°)
+    # se da la vuelta (rho se calcula con el theta efectivo de esa columna).
+    # Si theta_res no divide 180 las columnas no cierran el círculo y las
+    # que caen fuera del rango se descartan.
+    half = int(np.ceil(theta_window / theta_res))
+    theta_idxs = center[:, None] + np.arange(-half, half + 1)
+    if float(180.0 / theta_res).is_integer():
+        theta_idxs %= num_thetas
+        valid = None
+    else:
+        valid = (theta_idxs >= 0) & (theta_idxs < num_thetas)
+        theta_idxs = np.clip(theta_idxs, 0, num_thetas - 1)
+
+    cos_t = np.cos(thetas)
+    sin_t = np.sin(thetas)
+    rho_idxs = np.rint(x_idxs[:, None] * cos_t[theta_idxs] +
+                       y_idxs[:, None] * sin_t[theta_idxs]).astype(np.int64) + diag_len
+
+    flat = rho_idxs * num_thetas + theta_idxs
+    flat = flat.ravel() if valid is None else flat[valid]
+    votes = np.bincount(flat, minlength=accumulator.size)
+    accumulator += votes.reshape(accumulator.shape).astype(accumulator.dtype)
+    return accumulator, thetas, rhos
 
-    Retorna una lista de pares (rho, theta) ordenados por votos.
+def find_peaks_iterative(accumulator, thetas, rhos, threshold, min_distance=10):
+    """
+    Extractor de referencia: busca el máximo global, lo guarda y anula una
+    ventana alrededor, repitiendo mientras el máximo supere el umbral.
+    Costo O(picos x tamaño del acumulador).
     """
     peaks = []
     num_rhos, num_thetas = accumulator.shape
@@ -111,12 +432,535 @@ def find_peaks(accumulator, thetas, rhos, threshold, min_distance=10):
 
     return peaks
 
+def max_filter(array, radius):
+    """
+    Máximo en una vecindad cuadrada de radio `radius` (ventana de
+    (2*radius+1) x (2*radius+1)), separable: primero sobre filas y luego
+    sobre columnas, con un desplazamiento vectorizado por paso.
+    """
+    out = array
+    for axis in (0, 1):
+        src = out
+        out = src.copy()
+        n = src.shape[axis]
+        for shift in range(1, min(radius, n - 1) + 1):
+            head = [slice(None)] * 2
+            tail = [slice(None)] * 2
+            head[axis] = slice(shift, None)
+            tail[axis] = slice(None, -shift)
+            head, tail = tuple(head), tuple(tail)
+            np.maximum(out[head], src[tail], out=out[head])
+            np.maximum(out[tail], src[head], out=out[tail])
+    return out
+
+def theta_wraps(thetas, rhos):
+    """
+    True si el eje theta cierra el círculo: las columnas cubren [-90°, 90°)
+    con un paso que divide 180 y rho es simétrico, de modo que la columna
+    siguiente a la última es la primera con rho espejado, (ρ, 90°) ≡ (-ρ, -90°).
+    """
+    if len(thetas) < 2 or rhos[0] != -rhos[-1]:
+        return False
+    res = np.rad2deg(thetas[1] - thetas[0])
+    return bool(np.isclose(np.rad2deg(thetas[0]), -90.0) and np.isclose(len(thetas) * res, 180.0))
+
+def _wrapped_max_filter(accumulator, radius):
+    # max_filter con el eje theta circular: a cada lado se agregan las columnas
+    # del extremo opuesto con rho espejado (filas invertidas)
+    k = min(radius, accumulator.shape[1])
+    padded = np.concatenate([accumulator[::-1, -k:], accumulator, accumulator[::-1, :k]], axis=1)
+    return max_filter(padded, radius)[:, k:k + accumulator.shape[1]]
+
+def find_peaks_local_max(accumulator, thetas, rhos, threshold, min_distance=10, num_peaks=None):
+    """
+    Extractor vectorizado: marca como candidatos los máximos locales (en una
+    vecindad de radio `min_distance`) que alcanzan el umbral, toma los
+    `num_peaks` de más votos con un ordenamiento parcial y aplica la
+    supresión de no-máximos sólo sobre esa lista de candidatos.
+
+    Si el eje theta cierra el círculo (`theta_wraps`), la vecindad cruza el
+    borde ±90° comparando contra el vecino con rho espejado (ρ → -ρ), así una
+    misma recta cerca de ±90° no aparece dos veces.
+    """
+    wrap = theta_wraps(thetas, rhos)
+    num_rhos, num_thetas = accumulator.shape
+    local_max = _wrapped_max_filter(accumulator, min_distance) if wrap else max_filter(accumulator, min_distance)
+    is_peak = (accumulator == local_max) & (accumulator >= threshold)
+    cand_rho, cand_theta = np.nonzero(is_peak)
+    cand_votes = accumulator[cand_rho, cand_theta]
+    if len(cand_votes) == 0:
+        return []
+
+    limit = len(cand_votes) if num_peaks is None else num_peaks
+    take = min(limit, len(cand_votes))
+    while True:
+        # Top-k parcial; a igualdad de votos se respeta el orden de barrido
+        # (fila, columna), igual que `argmax` en el extractor iterativo
+        if take < len(cand_votes):
+            top = np.argpartition(-cand_votes.astype(np.int64), take - 1)[:take]
+        else:
+            top = np.arange(len(cand_votes))
+        top = top[np.lexsort((top, -cand_votes[top].astype(np.int64)))]
+
+        # Supresión voraz sobre los candidatos: se descarta un candidato si
+        # queda dentro de la ventana de un pico ya aceptado
+        keep_rho, keep_theta, keep = [], [], []
+        for idx in top:
+            r, t = cand_rho[idx], cand_theta[idx]
+            if keep:
+                kr, kt = np.asarray(keep_rho), np.asarray(keep_theta)
+                near = (np.abs(kr - r) <= min_distance) & (np.abs(kt - t) <= min_distance)
+                if wrap:
+                    # Del otro lado de ±90°: distancia angular circular y rho espejado
+                    near |= ((np.abs(kr - (num_rhos - 1 - r)) <= min_distance) &
+                             (num_thetas - np.abs(kt - t) <= min_distance))
+                if np.any(near):
+                    continue
+            keep_rho.append(r)
+            keep_theta.append(t)
+            keep.append(idx)
+            if len(keep) == limit:
+                break
+
+        # Si la supresión descartó candidatos y quedan más, se amplía el top-k
+        if len(keep) == limit or take == len(cand_votes):
+            break
+        take = min(2 * take, len(cand_votes))
+
+    return [(rhos[cand_rho[i]], thetas[cand_theta[i]], cand_votes[i]) for i in keep]
+
+# Extractores de picos disponibles para `find_peaks`
+PEAK_FINDERS = {
+    "iterative": find_peaks_iterative,
+    "local_max": find_peaks_local_max,
+}
+
+def find_peaks(accumulator, thetas, rhos, threshold, min_distance=10,
+               method="local_max", num_peaks=None):
+    """
+    Busca picos en el acumulador de Hough por encima de un umbral.
+    Aplica supresión de no-máximos para evitar detecciones duplicadas.
+
+    Parámetros
+    ----------
+    min_distance : int
+        Distancia mínima entre picos en el espacio de Hough.
+    method : str
+        "local_max" (por defecto): máximos locales vectorizados + supresión
+        sobre los candidatos. "iterative": extractor de referencia que anula
+        una ventana del acumulador por cada pico.
+    num_peaks : int
+        Cantidad máxima de picos a devolver (por defecto, todos).
+
+    Retorna una lista de tuplas (rho, theta, votos) ordenadas por votos.
+    """
+    if method not in PEAK_FINDERS:
+        raise ValueError(f"Método desconocido: {method!r} (opciones: {', '.join(PEAK_FINDERS)})")
+    if method == "iterative":
+        peaks = find_peaks_iterative(accumulator, thetas, rhos, threshold, min_distance)
+        return peaks if num_peaks is None else peaks[:num_peaks]
+    return find_peaks_local_max(accumulator, thetas, rhos, threshold, min_distance, num_peaks)
+
+def refine_peak(x_idxs, y_idxs, rho, theta, theta_span, rho_span, fine_theta_res, fine_rho_res):
+    """
+    Re-vota los píxeles dados en una sub-grilla fina local centrada en
+    (rho, theta) de semiancho `theta_span` (grados) y `rho_span` (píxeles).
+    Retorna el (rho, theta, votos) del máximo de la sub-grilla.
+    """
+    theta_deg = np.rad2deg(theta)
+    local_thetas = np.deg2rad(np.arange(theta_deg - theta_span,
+                                        theta_deg + theta_span + fine_theta_res / 2,
+                                        fine_theta_res))
+    rho_min = rho - rho_span
+    num_rhos = int(np.floor(2 * rho_span / fine_rho_res)) + 1
+    num_thetas = len(local_thetas)
+
+    rho_vals = x_idxs[:, None] * np.cos(local_thetas) + y_idxs[:, None] * np.sin(local_thetas)
+    rho_idxs = np.rint((rho_vals - rho_min) / fine_rho_res).astype(np.int64)
+    inside = (rho_idxs >= 0) & (rho_idxs < num_rhos)
+    flat = (rho_idxs * num_thetas + np.arange(num_thetas))[inside]
+    local_acc = np.bincount(flat, minlength=num_rhos * num_thetas).reshape(num_rhos, num_thetas)
+
+    rho_idx, theta_idx = _plateau_center(local_acc)
+    best_rho, best_theta = _wrap_line(rho_min + rho_idx * fine_rho_res, local_thetas[theta_idx])
+    return best_rho, best_theta, local_acc[rho_idx, theta_idx]
+
+def _plateau_center(local_acc):
+    """
+    Índices (rho, theta) del máximo de la sub-grilla; entre celdas empatadas
+    (meseta) elige la más cercana al centro, es decir, al candidato grueso.
+    """
+    num_rhos, num_thetas = local_acc.shape
+    tied_rho, tied_theta = np.nonzero(local_acc == local_acc.max())
+    center = np.hypot(tied_rho - (num_rhos - 1) / 2, tied_theta - (num_thetas - 1) / 2).argmin()
+    return tied_rho[center], tied_theta[center]
+
+def _wrap_line(rho, theta):
+    """
+    Lleva theta de vuelta a [-90°, 90°): (ρ, θ ± 180°) es la recta (-ρ, θ).
+    La tolerancia absorbe el error de redondeo de la grilla en grados.
+    """
+    eps = 1e-9
+    if theta < -np.pi / 2 - eps:
+        return -rho, theta + np.pi
+    if theta >= np.pi / 2 - eps:
+        return -rho, theta - np.pi
+    return rho, theta
+
+def rho_drift(x_idxs, y_idxs, theta, theta_span):
+    """
+    Cota de cuánto se mueve el rho de un píxel al corregir theta en hasta
+    `theta_span` grados: |dρ/dθ| = |-x·sin θ + y·cos θ| por el ángulo en
+    radianes. Crece con el tamaño de la imagen.
+    """
+    if len(x_idxs) == 0:
+        return 0.0
+    along = np.abs(-x_idxs * np.sin(theta) + y_idxs * np.cos(theta))
+    return float(along.max() * np.deg2rad(theta_span))
+
+def hough_lines_refined(binary_img, threshold, coarse_theta_res=1, fine_theta_res=0.1,
+                        fine_rho_res=0.5, band=2.0, min_distance=10, num_peaks=None):
+    """
+    Transformada de Hough multi-resolución (de grueso a fino).
+
+    Vota primero en la grilla gruesa (`coarse_theta_res` grados, 1 píxel) y
+    obtiene los candidatos con `find_peaks`. Para cada candidato re-vota sólo
+    los píxeles de borde cercanos a su recta, en una sub-grilla fina local de
+    ±`coarse_theta_res` grados con resolución `fine_theta_res` / `fine_rho_res`.
+    El semiancho en rho (y la banda de píxeles) es `band` más lo que puede
+    moverse rho al corregir theta (`rho_drift`): en imágenes grandes una
+    fracción de grado desplaza rho varios píxeles.
+
+    Retorna una lista de tuplas (rho, theta, votos) de alta precisión,
+    ordenadas por votos (los votos son los de la sub-grilla fina).
+    """
+    accumulator, thetas, rhos = hough_lines(binary_img, theta_res=coarse_theta_res)
+    candidates = find_peaks(accumulator, thetas, rhos, threshold, min_distance, num_peaks=num_peaks)
+
+    y_idxs, x_idxs = np.nonzero(binary_img)
+    peaks = []
+    for rho, theta, _ in candidates:
+        # Píxeles cercanos a la recta candidata, con margen para la corrección de theta
+        span = band + rho_drift(x_idxs, y_idxs, theta, coarse_theta_res)
+        dist = np.abs(x_idxs * np.cos(theta) + y_idxs * np.sin(theta) - rho)
+        near = dist <= span
+        peaks.append(refine_peak(x_idxs[near], y_idxs[near], rho, theta,
+                                 coarse_theta_res, span, fine_theta_res, fine_rho_res))
+
+    peaks.sort(key=lambda peak: -int(peak[2]))
+    return peaks
+
+def _line_steps(theta):
+    """
+    Paso unitario (en la coordenada dominante) a lo largo de la recta de
+    normal `theta`, cuya dirección es (-sin θ, cos θ).
+    """
+    dx, dy = -np.sin(theta), np.cos(theta)
+    if abs(dx) > abs(dy):
+        return np.sign(dx), dy / abs(dx)
+    return dx / abs(dy), np.sign(dy)
+
+def _walk_segment(mask, x0, y0, step, line_gap):
+    """
+    Recorre la máscara desde (x0, y0) en ambos sentidos a lo largo de la
+    recta y devuelve los extremos del segmento: se detiene al salir de la
+    imagen o tras más de `line_gap` píxeles vacíos consecutivos.
+
+    Si el píxel sobre la recta está vacío pero lo está encendido un vecino en
+    la coordenada secundaria, el recorrido se re-centra en él: así sigue la
+    recta real aunque el theta de la celda tenga el error de la grilla.
+    """
+    height, width = mask.shape
+    x_major = abs(step[0]) == 1
+    ends = []
+    for sign in (+1, -1):
+        sx, sy = sign * step[0], sign * step[1]
+        x, y = float(x0), float(y0)
+        end = (x0, y0)
+        gap = 0
+        while True:
+            x += sx
+            y += sy
+            xi, yi = int(round(x)), int(round(y))
+            if not (0 <= xi < width and 0 <= yi < height):
+                break
+            if not mask[yi, xi]:
+                for d in (-1, 1):
+                    xn, yn = (xi, yi + d) if x_major else (xi + d, yi)
+                    if 0 <= xn < width and 0 <= yn < height and mask[yn, xn]:
+                        xi, yi = xn, yn
+                        x, y = (x, float(yn)) if x_major else (float(xn), y)
+                        break
+            if mask[yi, xi]:
+                end = (xi, yi)
+                gap = 0
+            else:
+                gap += 1
+                if gap > line_gap:
+                    break
+        ends.append(end)
+    return ends[1], ends[0]
+
+def _segment_pixels(p0, p1, shape):
+    """
+    Píxeles de la cuerda entre p0 y p1 más sus vecinos en la coordenada
+    secundaria (el redondeo de la recta dibujada puede diferir en uno).
+    """
+    (x0, y0), (x1, y1) = p0, p1
+    n_steps = int(max(abs(x1 - x0), abs(y1 - y0)))
+    t = np.arange(n_steps + 1) / max(n_steps, 1)
+    xs = np.rint(x0 + t * (x1 - x0)).astype(np.int64)
+    ys = np.rint(y0 + t * (y1 - y0)).astype(np.int64)
+    if abs(x1 - x0) >= abs(y1 - y0):
+        xs, ys = np.tile(xs, 3), np.concatenate([ys - 1, ys, ys + 1])
+    else:
+        xs, ys = np.concatenate([xs - 1, xs, xs + 1]), np.tile(ys, 3)
+    inside = (xs >= 0) & (xs < shape[1]) & (ys >= 0) & (ys < shape[0])
+    return xs[inside], ys[inside]
+
+def merge_collinear_segments(segments, line_gap, max_dist=2.0):
+    """
+    Une los segmentos de una misma recta: dos segmentos se unen si los
+    extremos del más corto están a menos de `max_dist` píxeles de la recta
+    del más largo y, proyectados sobre ella, se superponen o los separan a
+    lo sumo `line_gap` píxeles. Se repite hasta que no quedan uniones.
+    """
+    segs = [(np.array(a, dtype=np.float64), np.array(b, dtype=np.float64)) for a, b in segments]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(segs)):
+            for j in range(i + 1, len(segs)):
+                (a0, a1), (b0, b1) = segs[i], segs[j]
+                if np.hypot(*(a1 - a0)) < np.hypot(*(b1 - b0)):
+                    (a0, a1), (b0, b1) = (b0, b1), (a0, a1)
+                length = np.hypot(*(a1 - a0))
+                if length == 0:
+                    continue
+                u = (a1 - a0) / length
+                normal = np.array([-u[1], u[0]])
+                if max(abs((b0 - a0) @ normal), abs((b1 - a0) @ normal)) > max_dist:
+                    continue
+                tb = sorted(((b0 - a0) @ u, (b1 - a0) @ u))
+                if tb[0] - length > line_gap + 1 or -tb[1] > line_gap + 1:
+                    continue
+                # El segmento unido va entre los extremos más alejados
+                points = [a0, a1, b0, b1]
+                proj = [(p - a0) @ u for p in points]
+                segs[i] = (points[int(np.argmin(proj))], points[int(np.argmax(proj))])
+                del segs[j]
+                merged = True
+                break
+            if merged:
+                break
+    return [((int(a[0]), int(a[1])), (int(b[0]), int(b[1]))) for a, b in segs]
+
+# Fracción mínima de la cuerda de un segmento que debe estar cubierta por
+# píxeles de borde para aceptarlo
+MIN_COVERAGE = 0.8
+
+def probabilistic_hough_segments(binary_img, threshold, theta_res=1, line_gap=3,
+                                 min_line_length=20, max_lines=None, rng=None):
+    """
+    Transformada de Hough probabilística progresiva con extracción de segmentos.
+
+    Toma los píxeles de borde en orden aleatorio y los vota de a uno. En
+    cuanto la celda más votada por el píxel alcanza `threshold`, recorre la
+    máscara sobre esa recta para obtener los extremos del segmento, quita sus
+    píxeles del conjunto (restando los votos de los que ya habían votado) y
+    sigue. Termina al agotar los píxeles o al encontrar `max_lines` segmentos.
+
+    Parámetros
+    ----------
+    binary_img : np.ndarray (2D)
+        Imagen binaria (bordes = píxeles no nulos).
+    threshold : int
+        Votos necesarios para aceptar una recta.
+    line_gap : int
+        Máximo de píxeles vacíos consecutivos dentro de un segmento.
+    min_line_length : float
+        Longitud mínima (en píxeles) de los segmentos devueltos.
+    max_lines : int
+        Corte temprano: cantidad máxima de segmentos a extraer.
+    rng : np.random.Generator
+        Generador para el orden de muestreo (por defecto, semilla 0).
+
+    Retorna una lista de segmentos ((x0, y0), (x1, y1)).
+    """
+    if rng is None:
+        rng = np.random.default_rng(0)
+
+    edges = binary_img != 0
+    mask = edges.copy()
+    voted = np.zeros_like(mask)
+    thetas, rhos, diag_len = hough_space(mask.shape, theta_res)
+    cos_t = np.cos(thetas)
+    sin_t = np.sin(thetas)
+    theta_range = np.arange(len(thetas))
+    accumulator = np.zeros((len(rhos), len(thetas)), dtype=np.int32)
+
+    def rho_indices(x, y):
+        return np.rint(x * cos_t + y * sin_t).astype(np.int64) + diag_len
+
+    y_idxs, x_idxs = np.nonzero(mask)
+    order = rng.permutation(len(x_idxs))
+    segments = []
+
+    for k in order:
+        x, y = int(x_idxs[k]), int(y_idxs[k])
+        # El píxel pudo haber sido retirado como parte de un segmento previo
+        if not mask[y, x]:
+            continue
+
+        rho_idxs = rho_indices(x, y)
+        accumulator[rho_idxs, theta_range] += 1
+        voted[y, x] = True
+
+        votes = accumulator[rho_idxs, theta_range]
+        theta_idx = int(votes.argmax())
+        if votes[theta_idx] < threshold:
+            continue
+
+        step = _line_steps(thetas[theta_idx])
+        (x0, y0), (x1, y1) = _walk_segment(edges, x, y, step, line_gap)
+        # Al re-centrarse, el recorrido puede pasar a una recta vecina: si la
+        # cuerda entre los extremos no está cubierta por bordes, se descarta
+        xs, ys = _segment_pixels((x0, y0), (x1, y1), mask.shape)
+        if edges[ys, xs].sum() < MIN_COVERAGE * (max(abs(x1 - x0), abs(y1 - y0)) + 1):
+            continue
+
+        # Retirar los píxeles del segmento (y sus votos, si ya habían votado)
+        for xi, yi in zip(xs, ys):
+            if not mask[yi, xi]:
+                continue
+            if voted[yi, xi]:
+                accumulator[rho_indices(xi, yi), theta_range] -= 1
+                voted[yi, xi] = False
+            mask[yi, xi] = False
+
+        if np.hypot(x1 - x0, y1 - y0) >= min_line_length:
+            segments.append(((x0, y0), (x1, y1)))
+            if max_lines is not None and len(segments) >= max_lines:
+                break
+
+    return merge_collinear_segments(segments, line_gap)
+
+def check_segments_demo(num_lines=5, size=200, seeds=range(5), threshold=40):
+    """
+    Chequeo de la demo de segmentos: en imágenes sintéticas de `num_lines`
+    rectas que cruzan toda la imagen, `probabilistic_hough_segments` debe
+    devolver exactamente un segmento por recta. Retorna la lista de
+    (semilla, segmentos obtenidos) de los casos que fallan.
+    """
+    failures = []
+    for seed in seeds:
+        img = generate_test_image(size, size, num_lines=num_lines, rng=np.random.default_rng(seed))
+        segments = probabilistic_hough_segments(img, threshold)
+        if len(segments) != num_lines:
+            failures.append((seed, segments))
+    return failures
+
+class StreamingHough:
+    """
+    Detector de rectas con estado para secuencias de cuadros (video).
+
+    Conserva el acumulador entre cuadros: en cada `update` suma los votos de
+    los píxeles de borde que aparecieron y resta los de los que
+    desaparecieron, reutilizando las tablas cos/sin. El costo de votación es
+    proporcional a la diferencia entre cuadros, no al tamaño del cuadro.
+    El acumulador resultante es idéntico al de `hough_lines` sobre el cuadro.
+
+    Guarda las latencias de los últimos `history` cuadros (`latencies_ms`) y
+    el total de todos (`mean_latency_ms`), así la memoria no crece con la
+    duración del video.
+    """
+
+    def __init__(self, shape, theta_res=1, rho_res=1, history=1000):
+        self.shape = tuple(shape)
+        self.thetas, self.rhos, self.diag_len = hough_space(self.shape, theta_res, rho_res)
+        self.cos_t = np.cos(self.thetas)
+        self.sin_t = np.sin(self.thetas)
+        self.accumulator = np.zeros((len(self.rhos), len(self.thetas)), dtype=np.uint64)
+        self.mask = np.zeros(self.shape, dtype=bool)
+        self.frames = 0
+        self.latencies_ms = deque(maxlen=history)
+        self.total_latency_ms = 0.0
+        self.last_added = 0
+        self.last_removed = 0
+
+    def _apply(self, pixels, ufunc):
+        """Suma (`np.add`) o resta (`np.subtract`) los votos de `pixels`."""
+        y_idxs, x_idxs = np.nonzero(pixels)
+        if len(x_idxs) == 0:
+            return
+        num_thetas = len(self.thetas)
+        if len(x_idxs) * num_thetas * 4 < self.accumulator.size:
+            # Diferencia chica: acumulación dispersa sin recorrer el acumulador
+            rho_idxs = np.rint(x_idxs[:, None] * self.cos_t +
+                               y_idxs[:, None] * self.sin_t).astype(np.int64) + self.diag_len
+            flat = (rho_idxs * num_thetas + np.arange(num_thetas)).ravel()
+            ufunc.at(self.accumulator.reshape(-1), flat, np.uint64(1))
+        else:
+            votes = vote_counts(x_idxs, y_idxs, self.cos_t, self.sin_t, self.diag_len,
+                                self.accumulator.shape)
+            ufunc(self.accumulator, votes.astype(self.accumulator.dtype), out=self.accumulator)
+
+    def update(self, binary_frame):
+        """
+        Incorpora un nuevo cuadro binario y retorna (accumulator, thetas, rhos).
+        """
+        if binary_frame.shape != self.shape:
+            raise ValueError(f"Tamaño de cuadro {binary_frame.shape} distinto de {self.shape}")
+        t0 = time.perf_counter()
+
+        mask = binary_frame != 0
+        added = mask & ~self.mask
+        removed = self.mask & ~mask
+
+        # Primero se restan los votos de los píxeles que desaparecieron
+        self._apply(removed, np.subtract)
+        self._apply(added, np.add)
+
+        self.mask = mask
+        self.frames += 1
+        self.last_added = int(added.sum())
+        self.last_removed = int(removed.sum())
+        latency = (time.perf_counter() - t0) * 1000
+        self.latencies_ms.append(latency)
+        self.total_latency_ms += latency
+        return self.accumulator, self.thetas, self.rhos
+
+    @property
+    def last_latency_ms(self):
+        return self.latencies_ms[-1] if self.latencies_ms else None
+
+    @property
+    def mean_latency_ms(self):
+        return self.total_latency_ms / self.frames if self.frames else None
+
+    def peaks(self, threshold, min_distance=10, num_peaks=None):
+        """Picos del acumulador actual (ver `find_peaks`)."""
+        return find_peaks(self.accumulator, self.thetas, self.rhos, threshold,
+                          min_distance, num_peaks=num_peaks)
+
+    def reset(self):
+        """Descarta el estado acumulado: votos, máscara y estadísticas de latencia."""
+        self.accumulator[:] = 0
+        self.mask[:] = False
+        self.frames = 0
+        self.latencies_ms.clear()
+        self.total_latency_ms = 0.0
+        self.last_added = 0
+        self.last_removed = 0
+
 def plot_results(img, accumulator, thetas, rhos, peaks):
     """
     Muestra:
     - la imagen original con las rectas detectadas
     - el acumulador de Hough
     """
+    import matplotlib.pyplot as plt
+
     fig, (ax_img, ax_acc) = plt.subplots(1, 2, figsize=(12, 5))
 
     # Imagen original
@@ -161,27 +1005,238 @@ def plot_results(img, accumulator, thetas, rhos, peaks):
     plt.tight_layout()
     plt.show()
 
-if __name__ == "__main__":
-    # 1. Generar imagen de prueba
-    img = generate_test_image()
-
-    # 2. En este ejemplo la imagen ya es binaria
-    binary_img = img
-
-    # 3. Aplicar transformada de Hough
-    print("Aplicando transformada de Hough...")
-    accumulator, thetas, rhos = hough_lines(binary_img,
-                                            theta_res=1,
-                                            rho_res=1)
-
-    # 4. Buscar picos en el acumulador
-    # Ajustar el umbral según el tamaño de las líneas
-    print("Buscando líneas en el acumulador...")
-    peaks = find_peaks(accumulator, thetas, rhos, threshold=80, min_distance=10)
-    
-    print(f"\nSe detectaron {len(peaks)} líneas:")
-    for idx, (rho, theta, votes) in enumerate(peaks):
-        print(f"  Línea {idx+1}: ρ={rho:.2f} píxeles, θ={np.rad2deg(theta):.2f}°, votos={votes}")
+def plot_segments(img, segments):
+    """
+    Muestra la imagen original con los segmentos detectados superpuestos.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 5))
+    ax.imshow(img, cmap='gray')
+    ax.set_title(f"Imagen original - {len(segments)} segmentos detectados")
+    ax.set_axis_off()
+    colors = plt.cm.rainbow(np.linspace(0, 1, len(segments)))
+    for idx, ((x0, y0), (x1, y1)) in enumerate(segments):
+        ax.plot((x0, x1), (y0, y1), linewidth=2, color=colors[idx])
+    plt.tight_layout()
+    plt.show()
+
+IMAGE_EXTENSIONS = (".npy", ".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff", ".pgm", ".ppm")
+
+def load_image(path):
+    """
+    Carga una imagen como arreglo 2D en escala de grises. Los `.npy` se leen
+    con NumPy; el resto con Pillow si está instalado o, si no, con
+    `matplotlib.image`.
+    """
+    if path.lower().endswith(".npy"):
+        return to_grayscale(np.load(path))
+    try:
+        from PIL import Image
+    except ImportError:
+        import matplotlib.image as mpimg
+        return to_grayscale(mpimg.imread(path))
+    with Image.open(path) as im:
+        return to_grayscale(np.asarray(im.convert("L")))
 
-    # 5. Visualizar resultados
-    plot_results(img, accumulator, thetas, rhos, peaks)
+def collect_images(paths):
+    """Expande directorios a los archivos de imagen que contienen (ordenados)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+def detect(img, args):
+    """
+    Aplica el modo de detección pedido por la línea de comandos a una imagen.
+    Retorna (filas de salida, datos para graficar).
+    """
+    if args.mode == "gradient":
+        accumulator, thetas, rhos = hough_lines_gradient(img, args.theta_res, args.rho_res)
+    else:
+        binary_img = binarize(img, args.binarize)
+        if args.mode == "probabilistic":
+            segments = probabilistic_hough_segments(binary_img, args.threshold, args.theta_res,
+                                                    max_lines=args.num_peaks)
+            rows = [{"x0": x0, "y0": y0, "x1": x1, "y1": y1} for (x0, y0), (x1, y1) in segments]
+            return rows, segments
+        if args.mode == "refined":
+            peaks = hough_lines_refined(binary_img, args.threshold, coarse_theta_res=args.theta_res,
+                                        min_distance=args.min_distance, num_peaks=args.num_peaks)
+            rows = [{"rho": float(rho), "theta_deg": float(np.rad2deg(theta)), "votes": int(votes)}
+                    for rho, theta, votes in peaks]
+            return rows, None
+        accumulator, thetas, rhos = hough_lines(binary_img, args.theta_res, args.rho_res,
+                                                engine=args.engine,
+                                                max_memory_mb=args.max_memory_mb,
+                                                workers=args.workers)
+    peaks = find_peaks(accumulator, thetas, rhos, args.threshold, args.min_distance,
+                       num_peaks=args.num_peaks)
+    rows = [{"rho": float(rho), "theta_deg": float(np.rad2deg(theta)), "votes": int(votes)}
+            for rho, theta, votes in peaks]
+    return rows, (accumulator, thetas, rhos, peaks)
+
+def write_rows(rows, fmt, out):
+    """Escribe una lista de diccionarios como JSON o CSV en `out`."""
+    if fmt == "json":
+        json.dump(rows, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+        return
+    fields = []
+    for row in rows:
+        for key in row:
+            if key not in fields:
+                fields.append(key)
+    writer = csv.DictWriter(out, fieldnames=fields, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+def run_benchmark(args):
+    """
+    Benchmark de escalado: genera imágenes sintéticas con
+    `generate_test_image` sobre la grilla tamaños x densidades de ruido x
+    cantidad de rectas y, para cada motor, mide el throughput de votación,
+    el tiempo de búsqueda de picos y la memoria pico (tracemalloc, sólo del
+    proceso principal, en una pasada separada de las cronometradas).
+    """
+    rows = []
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        for density in args.densities:
+            for num_lines in args.lines:
+                img = generate_test_image(size, size, num_lines=num_lines,
+                                          noise_density=density, rng=rng)
+                num_edges = int(np.count_nonzero(img))
+                num_thetas = len(np.arange(-90.0, 90.0, args.theta_res))
+                for engine in args.engines:
+                    def run():
+                        accumulator, thetas, rhos = hough_lines(img, args.theta_res, args.rho_res,
+                                                                engine=engine,
+                                                                max_memory_mb=args.max_memory_mb,
+                                                                workers=args.workers)
+                        t1 = time.perf_counter()
+                        peaks = find_peaks(accumulator, thetas, rhos, args.threshold,
+                                           args.min_distance, num_peaks=args.num_peaks)
+                        return t1, peaks
+
+                    # Tiempos sin tracemalloc (que instrumenta cada asignación
+                    # y los inflaría); la memoria pico se mide en una pasada aparte
+                    vote_times, peak_times = [], []
+                    for _ in range(args.repeat):
+                        t0 = time.perf_counter()
+                        t1, peaks = run()
+                        t2 = time.perf_counter()
+                        vote_times.append(t1 - t0)
+                        peak_times.append(t2 - t1)
+                    tracemalloc.start()
+                    try:
+                        run()
+                        peak_mem = tracemalloc.get_traced_memory()[1]
+                    finally:
+                        tracemalloc.stop()
+                    vote_s = min(vote_times)
+                    rows.append({
+                        "size": size,
+                        "density": density,
+                        "lines": num_lines,
+                        "engine": engine,
+                        "edges": num_edges,
+                        "vote_ms": round(vote_s * 1000, 3),
+                        "votes_per_s": round(num_edges * num_thetas / vote_s) if vote_s > 0 else None,
+                        "peaks_ms": round(min(peak_times) * 1000, 3),
+                        "peaks": len(peaks),
+                        "peak_mem_mb": round(peak_mem / (1024 * 1024), 3),
+                    })
+                    print(f"  {size}x{size} dens={density:<6} rectas={num_lines:<4} {engine:<10} "
+                          f"bordes={num_edges:<8} votación={rows[-1]['vote_ms']:>10.3f} ms "
+                          f"({rows[-1]['votes_per_s'] or 0:.3g} votos/s)  "
+                          f"picos={rows[-1]['peaks_ms']:>8.3f} ms  mem={rows[-1]['peak_mem_mb']:.1f} MB",
+                          file=sys.stderr)
+    return rows
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Transformada de Hough para rectas: detección sobre imágenes y benchmark de escalado."
+    )
+    parser.add_argument("paths", nargs="*",
+                        help="Imágenes o directorios a procesar (sin rutas: imagen sintética de prueba)")
+    parser.add_argument("--mode", choices=["standard", "gradient", "refined", "probabilistic"],
+                        default="standard", help="Variante de la transformada (default: standard)")
+    parser.add_argument("--engine", choices=list(VOTING_ENGINES), default="vectorized",
+                        help="Motor de votación de hough_lines (default: vectorized)")
+    parser.add_argument("--theta-res", type=float, default=1, help="Resolución de θ en grados (default: 1)")
+    parser.add_argument("--rho-res", type=float, default=1, help="Resolución de ρ en píxeles (default: 1)")
+    parser.add_argument("--threshold", type=int, default=80, help="Umbral de votos (default: 80)")
+    parser.add_argument("--min-distance", type=int, default=10,
+                        help="Distancia mínima entre picos (default: 10)")
+    parser.add_argument("--num-peaks", type=int, default=None, help="Máximo de rectas por imagen")
+    parser.add_argument("--binarize", type=float, default=127,
+                        help="Nivel de gris (0-255) a partir del cual un píxel es borde; las máscaras 0/1 "
+                             "se usan tal cual y las imágenes en [0, 1] se escalan (default: 127)")
+    parser.add_argument("--max-memory-mb", type=float, default=256,
+                        help="Memoria total de los motores chunked/parallel (default: 256)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos del motor parallel")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="Formato de salida")
+    parser.add_argument("--output", default=None, help="Archivo de salida (default: stdout)")
+    parser.add_argument("--plot", action="store_true", help="Muestra los resultados con matplotlib")
+    parser.add_argument("--check-segments", action="store_true",
+                        help="Verifica que la demo probabilística dé un segmento por recta")
+    bench = parser.add_argument_group("benchmark")
+    bench.add_argument("--benchmark", action="store_true", help="Ejecuta el benchmark de escalado")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1024],
+                       help="Lados de las imágenes sintéticas")
+    bench.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.01],
+                       help="Fracciones de píxeles de ruido")
+    bench.add_argument("--lines", type=int, nargs="+", default=[5, 50], help="Cantidades de rectas")
+    bench.add_argument("--engines", nargs="+", choices=list(VOTING_ENGINES),
+                       default=["vectorized", "chunked", "parallel"], help="Motores a comparar")
+    bench.add_argument("--repeat", type=int, default=3, help="Repeticiones por caso (se toma el mínimo)")
+    bench.add_argument("--seed", type=int, default=0, help="Semilla de las imágenes sintéticas")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.benchmark:
+            write_rows(run_benchmark(args), args.format, out)
+            return
+        if args.check_segments:
+            failures = check_segments_demo()
+            for seed, segments in failures:
+                print(f"semilla {seed}: {len(segments)} segmentos para 5 rectas", file=sys.stderr)
+            print("demo de segmentos: " + ("FALLA" if failures else "OK"), file=sys.stderr)
+            if failures:
+                sys.exit(1)
+            return
+
+        if args.paths:
+            images = [(path, load_image(path)) for path in collect_images(args.paths)]
+        else:
+            images = [("<sintética>", generate_test_image().astype(np.float64))]
+
+        rows = []
+        for path, img in images:
+            t0 = time.perf_counter()
+            detections, plot_data = detect(img, args)
+            dt = (time.perf_counter() - t0) * 1000
+            print(f"{path}: {len(detections)} detecciones en {dt:.1f} ms", file=sys.stderr)
+            for idx, row in enumerate(detections):
+                rows.append({"image": path, "index": idx, **row})
+            if args.plot and plot_data is not None:
+                if args.mode == "probabilistic":
+                    plot_segments(img, plot_data)
+                else:
+                    plot_results(img, *plot_data)
+        write_rows(rows, args.format, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()